@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+DemoScope Batch Runner
+======================
+Builds many custom product page variants from one manifest. Screenshots,
+App Preview videos and In-App Event videos all run through a single
+deduplicated job graph.
+
+Usage:
+    python3 batch.py MANIFEST [--jobs N] [--profile P] [--dry-run]
+
+The manifest is JSON, or YAML if PyYAML is installed. Every section of a
+variant is optional. Settings left out fall back to the constants in the
+three scripts, and paths are relative to the manifest:
+
+    {
+      "output_dir": "variants",
+      "variants": [
+        {
+          "name": "spring",
+          "screenshots": {
+            "clips": ["woman_1", "man_1"],
+            "languages": ["en-US", "de"],
+            "devices": ["iPhone", "iPad"],
+            "frame_timestamps": {"woman_1": "0:02"},
+            "bg_gradients": {"woman_1": [[255, 107, 107], [255, 160, 137]]},
+            "copy": {"en-US": {"woman_1": ["Spring\\nInto Video", "Subtitle"]}},
+            "prompter_text": {"woman_1": {"en-US": ["...", "...", "..."]}}
+          },
+          "preview": {
+            "clip_order": ["demo_man_1", "demo_woman_1"],
+            "devices": ["iPhone"],
+            "save_last_seconds": 3.8,
+            "music_path": "music.mp3"
+          },
+          "event": {
+            "clip_order": ["man_1", "woman_1"],
+            "clip_duration": 3,
+            "outputs": ["card", "details"],
+            "engine": "clips"
+          }
+        }
+      ]
+    }
+
+Every job is named by the build_cache key of what it depends on, so work
+shared by several variants runs once per batch. For example, one
+normalized clip in three previews, or an unchanged card in ten variants.
+Work already in the build directory from an earlier run is skipped. The
+finished files are then copied to <output_dir>/<name>/. A failing job
+only fails the variants that depend on it; the rest of the batch carries
+on, so a long overnight run is not lost to one bad clip.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+import build_cache
+import combine_preview_videos as cpv
+import ffmpeg_runner
+import generate_appstore_assets as gaa
+import png_output
+import script as event
+
+SIZES = {"iPhone": gaa.IPHONE_SIZE, "iPad": gaa.IPAD_SIZE}
+EVENT_OUTPUTS = {"card": event.OUTPUTS[0], "details": event.OUTPUTS[1]}
+WORKER_PROGRESS_INTERVAL = 30.0  # seconds between ffmpeg progress lines in a batch
+
+_FRAMES = {}  # (video, timestamp) -> extracted frame, per worker process
+
+
+# ─────────────────────────────────────────────
+# MANIFEST
+# ─────────────────────────────────────────────
+
+def load_manifest(path):
+    """Read a JSON or YAML manifest."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                sys.exit("ERROR: YAML manifests need PyYAML (pip install pyyaml); "
+                         "or use JSON.")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+@contextmanager
+def overridden(module, **values):
+    """Temporarily replace module-level settings (one job at a time per process)."""
+    saved = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+# ─────────────────────────────────────────────
+# JOBS  (run in worker processes)
+# ─────────────────────────────────────────────
+
+def _init_worker(latin_font, latin_font_index, cjk_fonts):
+    gaa._init_worker(latin_font, latin_font_index, cjk_fonts, {})
+    ffmpeg_runner.PROGRESS_INTERVAL = WORKER_PROGRESS_INTERVAL
+
+
+def _frame(video, ts):
+    key = (video, ts)
+    if key not in _FRAMES:
+        _FRAMES[key] = gaa.extract_frame(video, ts)
+    return _FRAMES[key]
+
+
+def card_job(target, size, lang, clip, video, ts, copy, prompter, gradient, profile):
+    """Render one card and encode it with the PNG profile."""
+    w, h = size
+    with overridden(gaa, COPY={lang: [copy]}, PROMPTER_TEXT={clip: {lang: prompter}},
+                    BG_GRADIENTS={clip: gradient}):
+        card = gaa.make_card(_frame(video, ts), w, h, clip, lang, 0)
+
+    def write(tmp):
+        png_output.save_fast(card, tmp)
+        png_output.optimize_png(tmp, profile)
+
+    build_cache.build_target(target, write)
+
+
+def normalize_job(input_path, target, w, h, save_last_seconds, threads):
+    with overridden(cpv, SAVE_LAST_SECONDS=save_last_seconds):
+        cpv.normalize_cached(input_path, target, w, h, threads)
+
+
+def music_job(music_path):
+    with overridden(cpv, MUSIC_PATH=music_path):
+        cpv.encode_music()
+
+
+def preview_job(clip_targets, music_target, target):
+    build_cache.build_target(
+        target, lambda tmp: cpv.concatenate_clips(clip_targets, tmp, music_target))
+
+
+def event_clip_job(input_path, target, w, h, clip_duration, threads):
+    with overridden(event, CLIP_DURATION=clip_duration):
+        build_cache.build_target(
+            target, lambda tmp: event.build_clip(input_path, tmp, w, h, threads))
+
+
+def event_concat_job(clip_targets, target):
+    build_cache.build_target(
+        target, lambda tmp: event.concatenate_clips(clip_targets, tmp))
+
+
+def event_render_job(input_paths, w, h, target, clip_duration, threads):
+    with overridden(event, CLIP_DURATION=clip_duration):
+        build_cache.build_target(
+            target, lambda tmp: event.render_set(input_paths, w, h, tmp, threads))
+
+
+# ─────────────────────────────────────────────
+# PLANNING
+# ─────────────────────────────────────────────
+
+def _resolve(base_dir, path):
+    return path if path is None or os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def plan_screenshots(spec, out_dir, profile, script_version, add_job, add_output):
+    clips = spec.get("clips", gaa.CLIPS)
+    for device in spec.get("devices", list(SIZES)):
+        w, h = SIZES[device]
+        for clip in clips:
+            video = os.path.join(gaa.PORTRAIT_DIR, f"{clip}.mp4")
+            if not os.path.exists(video):
+                raise FileNotFoundError(f"Missing: {video}")
+            ts = spec.get("frame_timestamps", {}).get(clip, gaa.FRAME_TIMESTAMPS.get(clip, "0:00"))
+            frame_id = build_cache.step_key("frame", build_cache.file_digest(video), ts)
+            gradient = tuple(tuple(c) for c in
+                             spec.get("bg_gradients", {}).get(clip, gaa.BG_GRADIENTS[clip]))
+            for lang in spec.get("languages", gaa.LANGUAGES):
+                copy = spec.get("copy", {}).get(lang, {}).get(clip)
+                copy = tuple(copy) if copy else gaa.COPY[lang][gaa.CLIPS.index(clip)]
+                prompter = list(spec.get("prompter_text", {}).get(clip, {}).get(
+                    lang, gaa.PROMPTER_TEXT[clip][lang]))
+
+                with overridden(gaa, COPY={lang: [copy]},
+                                PROMPTER_TEXT={clip: {lang: prompter}},
+                                BG_GRADIENTS={clip: gradient}):
+                    key = gaa.card_cache_key((None, (w, h), lang, 0, clip),
+                                             {clip: frame_id}, script_version, profile)
+                target = build_cache.target_path("cards", key[:24], ".png")
+                add_job(target, "card", card_job,
+                        (target, (w, h), lang, clip, video, ts, copy, prompter,
+                         gradient, profile))
+                add_output(target, os.path.join(out_dir, "AppStoreAssets", device, lang,
+                                                f"{clip}_{w}x{h}.png"))
+
+
+def plan_preview(spec, out_dir, base_dir, threads, add_job, add_output):
+    save_last = spec.get("save_last_seconds", cpv.SAVE_LAST_SECONDS)
+    music_path = _resolve(base_dir, spec.get("music_path", cpv.MUSIC_PATH))
+    for device in spec.get("devices", list(cpv.DEVICES)):
+        cfg = cpv.DEVICES[device]
+        w, h = cfg["width"], cfg["height"]
+        inputs = [cpv.get_input_path(cfg, c) for c in spec.get("clip_order", cpv.CLIP_ORDER)]
+        missing = [p for p in inputs if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"Missing: {', '.join(missing)}")
+
+        with overridden(cpv, SAVE_LAST_SECONDS=save_last, MUSIC_PATH=music_path):
+            clip_targets = [cpv.normalized_target(p, w, h) for p in inputs]
+            music = cpv.music_target()
+            key = cpv.preview_key(clip_targets, music)
+
+        for input_path, clip_target in zip(inputs, clip_targets):
+            add_job(clip_target, "normalize", normalize_job,
+                    (input_path, clip_target, w, h, save_last, threads))
+        deps = list(clip_targets)
+        if music is not None:
+            add_job(music, "music", music_job, (music_path,))
+            deps.append(music)
+        target = build_cache.target_path("previews", key, ".mp4")
+        add_job(target, "preview", preview_job, (clip_targets, music, target), deps)
+        add_output(target, os.path.join(out_dir, f"app_preview_{device}.mp4"))
+
+
+def plan_event(spec, out_dir, threads, add_job, add_output):
+    engine = spec.get("engine", event.ENGINE)
+    clip_duration = spec.get("clip_duration", event.CLIP_DURATION)
+    for name in spec.get("outputs", list(EVENT_OUTPUTS)):
+        source_dir, w, h, filename = EVENT_OUTPUTS[name]
+        with overridden(event, CLIP_ORDER=spec.get("clip_order", event.CLIP_ORDER),
+                        CLIP_DURATION=clip_duration, ENGINE=engine):
+            inputs = event.clip_inputs(source_dir)
+            digests = [build_cache.file_digest(p) for p in inputs]
+            key = event.output_key(digests, w, h)
+            clip_targets = [event.clip_target(d, w, h) for d in digests]
+
+        target = build_cache.target_path("events", key, ".mp4")
+        if engine == "clips":
+            for input_path, clip_target in zip(inputs, clip_targets):
+                add_job(clip_target, "event clip", event_clip_job,
+                        (input_path, clip_target, w, h, clip_duration, threads))
+            add_job(target, "event", event_concat_job, (clip_targets, target), clip_targets)
+        else:
+            add_job(target, "event", event_render_job,
+                    (inputs, w, h, target, clip_duration, threads))
+        add_output(target, os.path.join(out_dir, filename))
+
+
+def plan(manifest, base_dir, profile, threads):
+    """Build the job graph for every variant.
+
+    Returns (jobs, outputs, failed). jobs maps a target path to
+    (kind, fn, args, deps) and holds each unique target once. outputs maps a
+    variant name to its (target, destination) pairs. failed maps a variant
+    name to the reason it could not be planned.
+    """
+    out_root = _resolve(base_dir, manifest.get("output_dir", "variants"))
+    script_version = gaa._script_version()
+    jobs, outputs, failed = {}, {}, {}
+    requested = 0
+
+    for variant in manifest["variants"]:
+        name = variant["name"]
+        out_dir = os.path.join(out_root, name)
+        variant_jobs, variant_outputs = {}, []
+
+        def add_job(target, kind, fn, args, deps=()):
+            variant_jobs.setdefault(target, (kind, fn, args, list(deps)))
+
+        def add_output(target, dest):
+            variant_outputs.append((target, dest))
+
+        try:
+            if "screenshots" in variant:
+                plan_screenshots(variant["screenshots"], out_dir, profile,
+                                 script_version, add_job, add_output)
+            if "preview" in variant:
+                plan_preview(variant["preview"], out_dir, base_dir, threads,
+                             add_job, add_output)
+            if "event" in variant:
+                plan_event(variant["event"], out_dir, threads, add_job, add_output)
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            failed[name] = f"invalid variant: {e!r}"
+            continue
+
+        requested += len(variant_jobs)
+        for target, job in variant_jobs.items():
+            jobs.setdefault(target, job)
+        outputs[name] = variant_outputs
+
+    built = sum(os.path.exists(t) for t in jobs)
+    print(f"  Job graph: {requested} requested, {len(jobs)} unique, {built} already built")
+    return {t: job for t, job in jobs.items() if not os.path.exists(t)}, outputs, failed
+
+
+# ─────────────────────────────────────────────
+# EXECUTION
+# ─────────────────────────────────────────────
+
+def run_jobs(jobs, n_jobs):
+    """Run the graph, each job once its dependencies are done.
+
+    Returns {target: error message} for jobs that failed or were skipped
+    because a dependency failed.
+    """
+    errors = {}
+    done = 0
+    total = len(jobs)
+
+    def blocked(deps):
+        return next((d for d in deps if d in errors), None)
+
+    def finish(target, error=None):
+        nonlocal done
+        done += 1
+        if error is not None:
+            errors[target] = error
+            print(f"  FAILED {jobs[target][0]} {os.path.basename(target)}: {error}")
+        if done % 8 == 0 or done == total:
+            print(f"  Progress: {done}/{total}")
+
+    if n_jobs <= 1:
+        gaa._init_worker(gaa.LATIN_FONT, gaa.LATIN_FONT_INDEX, dict(gaa._LANG_CJK_FONTS), {})
+        for target, (_, fn, args, deps) in jobs.items():
+            failed_dep = blocked(deps)
+            if failed_dep is not None:
+                finish(target, f"needs {os.path.basename(failed_dep)}")
+                continue
+            try:
+                fn(*args)
+                finish(target)
+            except Exception as e:
+                finish(target, repr(e))
+        return errors
+
+    pending = dict(jobs)
+    running = {}
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(gaa.LATIN_FONT, gaa.LATIN_FONT_INDEX, dict(gaa._LANG_CJK_FONTS)),
+    ) as pool:
+        while pending or running:
+            for target, (_, fn, args, deps) in list(pending.items()):
+                failed_dep = blocked(deps)
+                if failed_dep is not None:
+                    del pending[target]
+                    finish(target, f"needs {os.path.basename(failed_dep)}")
+                elif not any(d in pending or d in running.values() for d in deps):
+                    del pending[target]
+                    running[pool.submit(fn, *args)] = target
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                target = running.pop(future)
+                error = future.exception()
+                finish(target, None if error is None else repr(error))
+    return errors
+
+
+def publish(outputs, errors, failed):
+    """Copy each variant's built targets to its output directory."""
+    for name, pairs in outputs.items():
+        bad = next((t for t, _ in pairs if t in errors or not os.path.exists(t)), None)
+        if bad is not None:
+            failed[name] = errors.get(bad, f"{os.path.basename(bad)} was not built")
+            continue
+        for target, dest in pairs:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copyfile(target, dest)
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DemoScope batch runner")
+    parser.add_argument("manifest", help="JSON or YAML variant manifest")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count, 1 = serial)")
+    parser.add_argument("--profile", choices=sorted(png_output.PROFILES),
+                        default=png_output.DEFAULT_PROFILE,
+                        help="PNG output profile for cards (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="plan the job graph and print it without running")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    manifest_path = os.path.abspath(args.manifest)
+    manifest = load_manifest(manifest_path)
+    # The scripts' input paths are relative to the repository
+    os.chdir(gaa.BASE_DIR)
+
+    print("DemoScope Batch Runner")
+    print("=" * 50)
+    print(f"Manifest: {manifest_path} ({len(manifest['variants'])} variants)")
+    print(f"Build cache: {build_cache.BUILD_DIR}")
+
+    gaa.detect_fonts()
+    threads = max(1, (os.cpu_count() or 1) // max(args.jobs, 1))
+    jobs, outputs, failed = plan(manifest, os.path.dirname(manifest_path),
+                                 args.profile, threads)
+
+    kinds = {}
+    for kind, *_ in jobs.values():
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print("  To build: " + (", ".join(f"{n} {k}" for k, n in sorted(kinds.items())) or "nothing"))
+    if args.dry_run:
+        return
+
+    errors = run_jobs(jobs, min(args.jobs, max(len(jobs), 1)))
+    publish(outputs, errors, failed)
+
+    print(f"\n{'=' * 50}")
+    print("  Summary")
+    print(f"{'=' * 50}")
+    for variant in manifest["variants"]:
+        name = variant["name"]
+        if name in failed:
+            print(f"  ✗ {name}: {failed[name]}")
+        else:
+            print(f"  ✓ {name}: {len(outputs[name])} files")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+DemoScope Pipeline Benchmarks
+=============================
+Times each stage of the asset, preview-video and event-video pipelines
+(generate_appstore_assets.py, combine_preview_videos.py, script.py)
+against the bundled Portrait/ and Landscape/ clips and music.mp3, and
+writes JSON that can be compared across commits.
+
+Usage:
+    python3 benchmark.py [--repeat N] [--output results.json]
+                         [--compare baseline.json] [--threshold 0.10]
+                         [--skip-video]
+
+Each stage reports min / median / mean wall-clock seconds over N runs.
+The JSON also records the git commit and the design and encoding
+constants, so a regression can be traced to a change such as
+PHONE_BEZEL_PCT or the x264 preset (script.X264_PRESET). With --compare, every stage is
+printed next to the baseline and stages slower by more than --threshold
+are flagged (exit status 1).
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import combine_preview_videos as cpv
+import generate_appstore_assets as gaa
+import png_output
+import script as event
+
+BENCH_CLIP = "woman_1"
+BENCH_LANG = "de"
+BENCH_DEVICE = ("iPad", gaa.IPAD_SIZE)
+
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+
+def reset_caches():
+    """Drop per-process caches so every run measures cold work."""
+    gaa._FONT_CACHE.clear()
+    gaa._LAYER_CACHE.clear()
+    gaa._TEXT_SPRITES.clear()
+    gaa._TEXT_SHADOWS.clear()
+    gaa._TEXT_WIDTH_CACHE.clear()
+    gaa._SHADES.clear()
+    gaa._CORNER_MASKS.clear()
+
+
+def reset_detected_fonts():
+    """Forget the fonts detect_fonts() picked, so the next call searches again."""
+    gaa.LATIN_FONT = None
+    gaa.LATIN_FONT_INDEX = 0
+    gaa._LANG_CJK_FONTS.clear()
+    gaa._FONT_INDEX = None
+
+
+def time_stage(fn, repeat, setup=None):
+    """Run fn() *repeat* times (after optional setup()) and summarise seconds."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "runs": len(times),
+    }
+
+
+def git_commit():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                            capture_output=True, text=True, cwd=gaa.BASE_DIR)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def config_snapshot():
+    """Constants whose changes should explain a timing difference."""
+    config = {
+        "IPHONE_SIZE": gaa.IPHONE_SIZE,
+        "IPAD_SIZE": gaa.IPAD_SIZE,
+        "PHONE_ASPECT": gaa.PHONE_ASPECT,
+        "PHONE_BODY_RADIUS_PCT": gaa.PHONE_BODY_RADIUS_PCT,
+        "PHONE_BEZEL_PCT": gaa.PHONE_BEZEL_PCT,
+        "PHONE_BORDER_PCT": gaa.PHONE_BORDER_PCT,
+        "SHADOW_BLUR_DOWNSCALE": gaa.SHADOW_BLUR_DOWNSCALE,
+        "SAVE_LAST_SECONDS": cpv.SAVE_LAST_SECONDS,
+        "FPS": cpv.FPS,
+        "VIDEO_BITRATE": cpv.VIDEO_BITRATE,
+        "AUDIO_BITRATE": cpv.AUDIO_BITRATE,
+        "H264_PROFILE": cpv.H264_PROFILE,
+        "H264_LEVEL": cpv.H264_LEVEL,
+        "EVENT_CLIP_DURATION": event.CLIP_DURATION,
+        "X264_PRESET": event.X264_PRESET,
+        "X264_CRF": event.X264_CRF,
+    }
+    # Round-trip so tuples compare equal to a baseline loaded from JSON
+    return json.loads(json.dumps(config))
+
+
+# ─────────────────────────────────────────────
+# STAGES
+# ─────────────────────────────────────────────
+
+def bench_detect_fonts(repeat):
+    """Time detect_fonts() without a font index (cold) and with a saved one (warm).
+
+    Both use a temporary FONT_INDEX_PATH, so the user's cached index
+    neither speeds up the cold runs nor gets rewritten.
+    """
+    saved_path = gaa.FONT_INDEX_PATH
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gaa.FONT_INDEX_PATH = os.path.join(tmpdir, "font_index.json")
+
+        def cold():
+            reset_caches()
+            reset_detected_fonts()
+            if os.path.exists(gaa.FONT_INDEX_PATH):
+                os.remove(gaa.FONT_INDEX_PATH)
+
+        def warm():
+            reset_caches()
+            reset_detected_fonts()  # reloads the index the cold runs saved
+
+        try:
+            results["detect_fonts"] = time_stage(gaa.detect_fonts, repeat, setup=cold)
+            results["detect_fonts_warm"] = time_stage(gaa.detect_fonts, repeat, setup=warm)
+        finally:
+            gaa.FONT_INDEX_PATH = saved_path
+            gaa._FONT_INDEX = None  # the fonts the warm runs found stay set
+    return results
+
+
+def bench_assets(repeat):
+    """Time the screenshot pipeline stages; returns {stage: stats}."""
+    results = bench_detect_fonts(repeat)
+
+    video = os.path.join(gaa.PORTRAIT_DIR, f"{BENCH_CLIP}.mp4")
+    ts = gaa.FRAME_TIMESTAMPS.get(BENCH_CLIP, "0:00")
+    results["extract_frame"] = time_stage(lambda: gaa.extract_frame(video, ts), repeat)
+    frame = gaa.extract_frame(video, ts)
+
+    _, (cw, ch) = BENCH_DEVICE
+    c1, c2 = gaa.BG_GRADIENTS[BENCH_CLIP]
+    phone_w, phone_h, bezel = gaa.phone_geometry(cw, ch)
+    screen_w, screen_h = phone_w - 2 * bezel, phone_h - 2 * bezel
+    clip_idx = gaa.CLIPS.index(BENCH_CLIP)
+    tagline, subtitle = gaa.COPY[BENCH_LANG][clip_idx]
+
+    results["gradient_bg"] = time_stage(
+        lambda: gaa.gradient_bg(cw, ch, c1, c2), repeat)
+    results["create_screen_content"] = time_stage(
+        lambda: gaa.create_screen_content(frame, screen_w, screen_h, BENCH_LANG, BENCH_CLIP),
+        repeat, setup=reset_caches)
+
+    screen = gaa.create_screen_content(frame, screen_w, screen_h, BENCH_LANG, BENCH_CLIP)
+    results["build_phone_mockup"] = time_stage(
+        lambda: gaa.build_phone_mockup(screen, phone_w, phone_h, bezel, c1), repeat)
+
+    canvas = gaa.gradient_bg(cw, ch, c1, c2, mode="RGBA")
+
+    def draw_text():
+        tag_font = gaa.get_font(BENCH_LANG, int(ch * 0.050))
+        sub_font = gaa.get_font(BENCH_LANG, int(ch * 0.032))
+        c, bottom = gaa.draw_label_text(canvas.copy(), cw // 2, int(ch * 0.040),
+                                        tagline, tag_font)
+        gaa.draw_text_with_shadow(c, (cw // 2, bottom), subtitle, sub_font,
+                                  shadow_offset=(0, 3), shadow_blur=6, anchor="ma")
+
+    results["text_drawing"] = time_stage(draw_text, repeat, setup=reset_caches)
+    results["make_card"] = time_stage(
+        lambda: gaa.make_card(frame, cw, ch, BENCH_CLIP, BENCH_LANG, clip_idx),
+        repeat, setup=reset_caches)
+
+    card = gaa.make_card(frame, cw, ch, BENCH_CLIP, BENCH_LANG, clip_idx)
+    results["png_save_fast"] = time_stage(
+        lambda: png_output.save_fast(card, io.BytesIO()), repeat)
+    results["png_save_optimize"] = time_stage(
+        lambda: card.save(io.BytesIO(), "PNG", optimize=True), repeat)
+    return results
+
+
+def bench_video(repeat):
+    """Time the preview-video ffmpeg steps on a bundled clip; returns {stage: stats}."""
+    results = {}
+    cfg = cpv.DEVICES["iPhone"]
+    clips = [os.path.join(gaa.PORTRAIT_DIR, f"{c}.mp4") for c in gaa.CLIPS]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        normalized = [os.path.join(tmpdir, f"{i:02d}.mp4") for i in range(len(clips))]
+        results["normalize_clip"] = time_stage(
+            lambda: cpv.normalize_clip(clips[0], normalized[0], cfg["width"], cfg["height"]),
+            repeat)
+        for src, dst in zip(clips[1:], normalized[1:]):
+            cpv.normalize_clip(src, dst, cfg["width"], cfg["height"])
+
+        concat_out = os.path.join(tmpdir, "concat.mp4")
+        results["concatenate_clips"] = time_stage(
+            lambda: cpv.concatenate_clips(normalized, concat_out), repeat)
+
+        music_out = os.path.join(tmpdir, "music.mp4")
+        results["add_music"] = time_stage(
+            lambda: cpv.add_music(music_out), repeat,
+            setup=lambda: shutil.copyfile(concat_out, music_out))
+    return results
+
+
+def bench_event(repeat):
+    """Time script.py's event-video encodes on the Landscape/ clips; returns {stage: stats}."""
+    results = {}
+    clips = event.clip_inputs(os.path.join(gaa.BASE_DIR, "Landscape"))
+    w, h = event.LANDSCAPE_W, event.LANDSCAPE_H
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clip_out = os.path.join(tmpdir, "clip.mp4")
+        results["event_build_clip"] = time_stage(
+            lambda: event.build_clip(clips[0], clip_out, w, h), repeat)
+        set_out = os.path.join(tmpdir, "event_card.mp4")
+        results["event_render_set"] = time_stage(
+            lambda: event.render_set(clips, w, h, set_out), repeat)
+    return results
+
+
+# ─────────────────────────────────────────────
+# COMPARISON
+# ─────────────────────────────────────────────
+
+def compare(results, baseline, threshold):
+    """Print each stage against the baseline; returns the regressed stage names."""
+    regressions = []
+    print(f"\n  {'stage':<24}{'baseline':>10}{'current':>10}{'change':>9}")
+    for stage, stats in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None:
+            print(f"  {stage:<24}{'—':>10}{stats['median']:>9.3f}s{'new':>9}")
+            continue
+        change = stats["median"] / base["median"] - 1 if base["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(stage)
+            flag = "  ⚠"
+        print(f"  {stage:<24}{base['median']:>9.3f}s{stats['median']:>9.3f}s"
+              f"{change:>+8.0%}{flag}")
+
+    changed = {k: (baseline.get("config", {}).get(k), v)
+               for k, v in results["config"].items()
+               if baseline.get("config", {}).get(k) != v}
+    for key, (old, new) in changed.items():
+        print(f"  config {key}: {old} → {new}")
+    return regressions
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DemoScope pipeline benchmarks")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per stage (default: %(default)s)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="median slowdown flagged as a regression (default: 10%%)")
+    parser.add_argument("--skip-video", action="store_true",
+                        help="skip the ffmpeg preview- and event-video stages")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    os.chdir(gaa.BASE_DIR)
+
+    print("DemoScope Pipeline Benchmarks")
+    print("=" * 50)
+
+    stages = bench_assets(args.repeat)
+    if not args.skip_video:
+        stages.update(bench_video(args.repeat))
+        stages.update(bench_event(args.repeat))
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "repeat": args.repeat,
+        "config": config_snapshot(),
+        "stages": stages,
+    }
+
+    print(f"\n  {'stage':<24}{'min':>9}{'median':>9}")
+    for stage, stats in stages.items():
+        print(f"  {stage:<24}{stats['min']:>8.3f}s{stats['median']:>8.3f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n  Results → {args.output}")
+    else:
+        print()
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n  ⚠  Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
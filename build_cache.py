@@ -0,0 +1,99 @@
+"""
+Persistent build directory for the video pipelines
+==================================================
+Intermediate encodes are stored under BUILD_DIR, named by a key that
+hashes everything they depend on: the input file contents and the
+settings that affect the encode. When nothing a step depends on has
+changed, its target already exists and the step is skipped, make-style.
+Reordering clips or swapping one of them only rebuilds what actually
+changed.
+
+Final outputs are tracked with stamp files that record the key they were
+built from, so an unchanged output is not rebuilt either.
+
+Delete BUILD_DIR to force a full rebuild.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+BUILD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".build")
+
+_DIGESTS = {}  # (abspath, mtime_ns, size) -> sha256 of contents
+_DIGEST_LOCK = threading.Lock()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, memoised on path, mtime and size."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _DIGEST_LOCK:
+        if memo_key in _DIGESTS:
+            return _DIGESTS[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _DIGEST_LOCK:
+        _DIGESTS[memo_key] = digest
+    return digest
+
+
+def step_key(*parts):
+    """Stable key for a build step from JSON-serialisable dependencies."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+
+def target_path(group, key, suffix):
+    """Path of the intermediate for *key* under BUILD_DIR/<group>/."""
+    return os.path.join(BUILD_DIR, group, key + suffix)
+
+
+def build_target(path, build_fn):
+    """Build *path* with build_fn(tmp_path) unless it already exists.
+
+    build_fn writes to a temporary name next to *path* (same extension, so
+    ffmpeg picks the same muxer), which is renamed into place only on
+    success, so an interrupted build never leaves a stale target.
+    Returns (path, built) where built is False for a cache hit.
+    """
+    if os.path.exists(path):
+        return path, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.partial{ext}"
+    try:
+        build_fn(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path, True
+
+
+def _stamp_path(output_path):
+    name = hashlib.sha256(os.path.abspath(output_path).encode()).hexdigest()[:24]
+    return os.path.join(BUILD_DIR, "stamps", name)
+
+
+def output_is_current(output_path, key):
+    """True if *output_path* exists and was last built from *key*."""
+    if not os.path.exists(output_path):
+        return False
+    try:
+        with open(_stamp_path(output_path), encoding="utf-8") as f:
+            return f.read().strip() == key
+    except OSError:
+        return False
+
+
+def record_output(output_path, key):
+    """Remember that *output_path* was built from *key*."""
+    stamp = _stamp_path(output_path)
+    os.makedirs(os.path.dirname(stamp), exist_ok=True)
+    with open(stamp, "w", encoding="utf-8") as f:
+        f.write(key + "\n")
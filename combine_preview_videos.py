@@ -21,14 +21,23 @@ iPad resolutions (portrait):
   - 13"/12.9"/11"/10.5" displays: 1200x1600
   - 9.7" display: 900x1200
 
+Normalized clips and the encoded music are kept in a persistent build
+directory (build_cache.BUILD_DIR), keyed on the input file contents, the
+trim and target size and the encoding settings. Reordering CLIP_ORDER or
+swapping one clip re-encodes only what changed and then redoes the concat.
+
 Usage:
   python3 combine_preview_videos.py
 """
 
+import json
 import subprocess
 import os
 import sys
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import build_cache
+from ffmpeg_runner import run_ffmpeg, trace_span, write_trace
 
 # ─────────────────────────────────────────────
 # VIDEO ORDER — Rearrange this list to change
@@ -85,6 +94,24 @@ H264_LEVEL = "4.0"
 # ─────────────────────────────────────────────
 MUSIC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "music.mp3")
 
+# ─────────────────────────────────────────────
+# PARALLELISM — Clip normalizations and final
+# concats for all devices share one bounded
+# pool of encoders.
+# Each encoder gets an equal share of the CPU
+# cores via ffmpeg's -threads option.
+# Set to 1 to encode one clip at a time.
+# ─────────────────────────────────────────────
+MAX_PARALLEL_ENCODES = None  # None = one per clip, capped by CPU count
+
+# ─────────────────────────────────────────────
+# TRACING — Every ffmpeg run reports live
+# fps/speed and its CPU time and peak memory.
+# Set a path to also write a Chrome trace of
+# the whole run (open in ui.perfetto.dev).
+# ─────────────────────────────────────────────
+TRACE_PATH = None  # e.g. "app_preview_trace.json"
+
 
 def get_input_path(device_cfg, clip_name):
     """Build the input file path for a clip.
@@ -96,13 +123,77 @@ def get_input_path(device_cfg, clip_name):
     return os.path.join(device_cfg["input_dir"], filename)
 
 
-def normalize_clip(input_path, output_path, target_w, target_h):
+def encoder_budget(n_encodes):
+    """Return (workers, threads_per_encode) for *n_encodes* concurrent clips.
+
+    workers * threads_per_encode stays within the available CPU cores.
+    """
+    cores = os.cpu_count() or 1
+    workers = MAX_PARALLEL_ENCODES or min(n_encodes, cores)
+    workers = max(1, min(workers, n_encodes))
+    return workers, max(1, cores // workers)
+
+
+def encoding_settings():
+    """Constants that change every encode's output."""
+    return [FPS, VIDEO_BITRATE, AUDIO_BITRATE, AUDIO_SAMPLE_RATE, H264_PROFILE, H264_LEVEL]
+
+
+def video_codec_args():
+    """ffmpeg output options for App Preview H.264 video, used by every encode."""
+    return [
+        "-c:v", "libx264",
+        "-profile:v", H264_PROFILE,
+        "-level:v", H264_LEVEL,
+        "-b:v", VIDEO_BITRATE,
+        "-maxrate", VIDEO_BITRATE,
+        "-bufsize", "20M",
+        "-r", str(FPS),
+        "-vsync", "cfr",
+        "-pix_fmt", "yuv420p",
+        "-color_range", "tv",
+        "-colorspace", "bt709",
+        "-color_primaries", "bt709",
+        "-color_trc", "bt709",
+    ]
+
+
+def audio_codec_args():
+    """ffmpeg output options for App Preview AAC audio, used by every encode."""
+    return [
+        "-c:a", "aac",
+        "-b:a", AUDIO_BITRATE,
+        "-ar", str(AUDIO_SAMPLE_RATE),
+        "-ac", "2",
+    ]
+
+
+def normalized_target(input_path, target_w, target_h):
+    """Build-directory path of *input_path* normalized to target_w x target_h."""
+    key = build_cache.step_key(
+        "normalize", build_cache.file_digest(input_path),
+        SAVE_LAST_SECONDS, target_w, target_h, encoding_settings())
+    return build_cache.target_path("normalized", key, ".mp4")
+
+
+def normalize_cached(input_path, target, target_w, target_h, threads=None):
+    """normalize_clip() into *target* unless an identical encode is already built."""
+    _, built = build_cache.build_target(
+        target, lambda tmp: normalize_clip(input_path, tmp, target_w, target_h, threads))
+    if not built:
+        print(f"  Reusing: {os.path.basename(input_path)}")
+    return target
+
+
+def normalize_clip(input_path, output_path, target_w, target_h, threads=None):
     """Re-encode a single clip to match App Preview specs exactly.
 
     - Scales/crops to exact target resolution
     - Adds silent stereo audio track (required by App Store Connect)
     - Encodes H.264 High Profile Level 4.0
     - Forces 30fps CFR, yuv420p, bt709 color
+
+    *threads* caps ffmpeg's thread count when several clips encode at once.
     """
     video_filter = (
         # Scale to cover target, then crop to exact size
@@ -129,25 +220,10 @@ def normalize_clip(input_path, output_path, target_w, target_h):
         "-f", "lavfi", "-i",
         f"anullsrc=channel_layout=stereo:sample_rate={AUDIO_SAMPLE_RATE}",
         # Video encoding
-        "-c:v", "libx264",
-        "-profile:v", H264_PROFILE,
-        "-level:v", H264_LEVEL,
-        "-b:v", VIDEO_BITRATE,
-        "-maxrate", VIDEO_BITRATE,
-        "-bufsize", "20M",
-        "-r", str(FPS),
-        "-vsync", "cfr",
-        "-pix_fmt", "yuv420p",
-        "-color_range", "tv",
-        "-colorspace", "bt709",
-        "-color_primaries", "bt709",
-        "-color_trc", "bt709",
+        *video_codec_args(),
         "-vf", video_filter,
         # Audio encoding (from the silent source)
-        "-c:a", "aac",
-        "-b:a", AUDIO_BITRATE,
-        "-ar", str(AUDIO_SAMPLE_RATE),
-        "-ac", "2",
+        *audio_codec_args(),
         # Use shortest input to determine duration (video length, not infinite audio)
         "-shortest",
         # Map: video from input 0, audio from input 1
@@ -155,52 +231,104 @@ def normalize_clip(input_path, output_path, target_w, target_h):
         "-map", "1:a:0",
         # Faststart for streaming
         "-movflags", "+faststart",
-        output_path,
     ]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd.append(output_path)
 
     print(f"  Normalizing: {os.path.basename(input_path)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, f"normalize {os.path.basename(input_path)}")
     if result.returncode != 0:
         print(f"  ERROR:\n{result.stderr[-3000:]}")
         raise RuntimeError(f"ffmpeg failed for {input_path}")
+    return output_path
 
 
-def concatenate_clips(clip_paths, output_path):
-    """Concatenate normalized clips using ffmpeg concat demuxer."""
+# Stream fields that must agree for a lossless concat demuxer join
+CONCAT_MATCH_FIELDS = [
+    "codec_type", "codec_name", "profile", "level",
+    "width", "height", "pix_fmt", "sample_aspect_ratio",
+    "r_frame_rate", "time_base", "color_space", "color_primaries", "color_transfer",
+    "sample_rate", "channels", "channel_layout",
+]
+
+
+def probe_stream_params(filepath):
+    """Return the codec parameters of each stream, as compared for concat."""
+    cmd = [
+        "ffprobe", "-v", "quiet",
+        "-show_entries", "stream=" + ",".join(CONCAT_MATCH_FIELDS),
+        "-of", "json",
+        filepath,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    streams = json.loads(result.stdout).get("streams", [])
+    return [{k: stream.get(k) for k in CONCAT_MATCH_FIELDS} for stream in streams]
+
+
+def clips_match(clip_paths):
+    """True if every clip has identical stream parameters (per ffprobe)."""
+    params = [probe_stream_params(p) for p in clip_paths]
+    if any(p is None for p in params):
+        return False
+    return all(p == params[0] for p in params[1:])
+
+
+def concatenate_clips(clip_paths, output_path, music_path=None, threads=None):
+    """Concatenate normalized clips using ffmpeg concat demuxer.
+
+    Clips normalized to identical parameters are joined with stream copy;
+    any mismatch reported by ffprobe falls back to a full re-encode, capped
+    at *threads* like a clip normalization.
+
+    With *music_path* (an AAC file from encode_music), the music replaces
+    the silent track and is trimmed to the video in the same pass.
+    """
     concat_list = output_path + ".concat.txt"
     with open(concat_list, "w") as f:
         for p in clip_paths:
             f.write(f"file '{os.path.abspath(p)}'\n")
 
+    stream_copy = clips_match(clip_paths)
     cmd = [
         "ffmpeg", "-y",
         "-f", "concat",
         "-safe", "0",
         "-i", concat_list,
+    ]
+    if music_path is not None:
+        cmd += [
+            "-i", music_path,
+            # Take video from the concat, audio from the pre-encoded music
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            # End when the video ends (don't extend for longer music)
+            "-shortest",
+        ]
+    if stream_copy:
+        # Already encoded to spec — join without a second generation loss
+        cmd += ["-c", "copy"]
+    else:
         # Re-encode to ensure clean output with correct specs
-        "-c:v", "libx264",
-        "-profile:v", H264_PROFILE,
-        "-level:v", H264_LEVEL,
-        "-b:v", VIDEO_BITRATE,
-        "-maxrate", VIDEO_BITRATE,
-        "-bufsize", "20M",
-        "-r", str(FPS),
-        "-vsync", "cfr",
-        "-pix_fmt", "yuv420p",
-        "-color_range", "tv",
-        "-colorspace", "bt709",
-        "-color_primaries", "bt709",
-        "-color_trc", "bt709",
-        "-c:a", "aac",
-        "-b:a", AUDIO_BITRATE,
-        "-ar", str(AUDIO_SAMPLE_RATE),
-        "-ac", "2",
+        cmd += video_codec_args()
+        if music_path is not None:
+            cmd += ["-c:a", "copy"]
+        else:
+            cmd += audio_codec_args()
+        if threads:
+            cmd += ["-threads", str(threads)]
+    cmd += [
         "-movflags", "+faststart",
         output_path,
     ]
 
-    print(f"  Concatenating → {output_path}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    mode = "stream copy" if stream_copy else "re-encode, clip parameters differ"
+    if music_path is not None:
+        mode += " + music"
+    print(f"  Concatenating ({mode}) → {output_path}")
+    result = run_ffmpeg(cmd, f"concat {os.path.basename(output_path)}")
     os.remove(concat_list)
     if result.returncode != 0:
         print(f"  ERROR:\n{result.stderr[-2000:]}")
@@ -221,8 +349,53 @@ def get_duration(filepath):
     return float(result.stdout.strip())
 
 
+def music_target():
+    """Build-directory path of the encoded MUSIC_PATH, or None if no music."""
+    if MUSIC_PATH is None or not os.path.exists(MUSIC_PATH):
+        return None
+    key = build_cache.step_key("music", build_cache.file_digest(MUSIC_PATH),
+                               AUDIO_BITRATE, AUDIO_SAMPLE_RATE)
+    return build_cache.target_path("music", key, ".m4a")
+
+
+def encode_music():
+    """Encode MUSIC_PATH to AAC once, for reuse by every device's final pass.
+
+    The encode is kept in the build directory until the music or the audio
+    settings change. Returns the .m4a path, or None if no music is configured.
+    """
+    target = music_target()
+    if target is None:
+        return None
+
+    path, built = build_cache.build_target(target, _encode_music)
+    if not built:
+        print(f"Reusing encoded music: {os.path.basename(MUSIC_PATH)}")
+    return path
+
+
+def _encode_music(output_path):
+    cmd = [
+        "ffmpeg", "-y",
+        "-i", MUSIC_PATH,
+        "-vn",
+        *audio_codec_args(),
+        output_path,
+    ]
+
+    print(f"Encoding music once: {os.path.basename(MUSIC_PATH)}")
+    result = run_ffmpeg(cmd, "encode music")
+    if result.returncode != 0:
+        print(f"  ERROR encoding music:\n{result.stderr[-2000:]}")
+        raise RuntimeError("Failed to encode music")
+
+
 def add_music(video_path):
-    """Replace the silent audio track with music.mp3, clipped to the video length."""
+    """Replace the silent audio track with music.mp3, clipped to the video length.
+
+    Standalone remux pass; process_device() folds music into the concat
+    instead when given a pre-encoded track.
+    """
     if MUSIC_PATH is None or not os.path.exists(MUSIC_PATH):
         print(f"  Skipping music — {MUSIC_PATH} not found")
         return
@@ -235,10 +408,7 @@ def add_music(video_path):
         # Copy video stream as-is (already encoded to spec)
         "-c:v", "copy",
         # Re-encode audio from music file
-        "-c:a", "aac",
-        "-b:a", AUDIO_BITRATE,
-        "-ar", str(AUDIO_SAMPLE_RATE),
-        "-ac", "2",
+        *audio_codec_args(),
         # Take video from input 0, audio from input 1
         "-map", "0:v:0",
         "-map", "1:a:0",
@@ -249,7 +419,7 @@ def add_music(video_path):
     ]
 
     print(f"  Adding music: {os.path.basename(MUSIC_PATH)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, f"add music {os.path.basename(video_path)}")
     if result.returncode != 0:
         print(f"  ERROR adding music:\n{result.stderr[-2000:]}")
         raise RuntimeError("Failed to add music")
@@ -257,8 +427,35 @@ def add_music(video_path):
     os.replace(tmp_output, video_path)
 
 
-def process_device(device_name, device_cfg):
-    """Process all clips for a single device type."""
+def preview_key(targets, music_path=None):
+    """Key of a preview built from normalized *targets* in order, plus the music."""
+    return build_cache.step_key(
+        "concat", [os.path.basename(t) for t in targets],
+        music_path and os.path.basename(music_path), encoding_settings())
+
+
+def run_encode(encode_pool, fn, *args):
+    """Call fn(*args) in a slot of *encode_pool* (if any) and return its result."""
+    if encode_pool is None:
+        return fn(*args)
+    return encode_pool.submit(fn, *args).result()
+
+
+def process_device(device_name, device_cfg, encode_pool=None, threads=None,
+                   music_path=None):
+    """Process all clips for a single device type.
+
+    With an *encode_pool*, clip normalizations are submitted to the shared
+    pool and concatenation starts as soon as this device's clips are done.
+    The concat and any music remux also take a pool slot, so they count
+    against the encoder budget while other devices' clips are encoding.
+    With a pre-encoded *music_path*, music is mixed in during the concat
+    instead of a separate remux.
+
+    Normalized clips come from the build directory when already encoded, and
+    the whole device is skipped when its output was built from the same
+    clips, order and music.
+    """
     target_w = device_cfg["width"]
     target_h = device_cfg["height"]
     output_path = device_cfg["output"]
@@ -291,30 +488,45 @@ def process_device(device_name, device_cfg):
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Step 1: Normalize each clip
-        normalized = []
-        for i, (clip_name, input_path) in enumerate(clip_paths):
-            norm_path = os.path.join(tmpdir, f"{i:02d}_{clip_name}.mp4")
-            normalize_clip(input_path, norm_path, target_w, target_h)
-            normalized.append(norm_path)
+    targets = [normalized_target(p, target_w, target_h) for _, p in clip_paths]
+    output_key = preview_key(targets, music_path)
+    if build_cache.output_is_current(output_path, output_key):
+        print(f"\n  {device_name}: up to date, nothing to rebuild → {output_path}")
+        return True
+
+    # Step 1: Normalize each clip (a clip used twice is encoded once)
+    jobs = {}
+    for (_, input_path), target in zip(clip_paths, targets):
+        jobs.setdefault(target, (input_path, target, target_w, target_h, threads))
 
-        # Step 2: Concatenate
-        concatenate_clips(normalized, output_path)
+    if encode_pool is None:
+        for job in jobs.values():
+            normalize_cached(*job)
+    else:
+        futures = [encode_pool.submit(normalize_cached, *job) for job in jobs.values()]
+        wait(futures)
+        for f in futures:
+            f.result()
+
+    # Step 2: Concatenate (with music, clipped to video length)
+    run_encode(encode_pool, concatenate_clips, targets, output_path, music_path, threads)
 
-    # Step 3: Layer music on top (clipped to video length)
-    add_music(output_path)
+    # Step 3: No pre-encoded music — fall back to a separate remux
+    if music_path is None:
+        run_encode(encode_pool, add_music, output_path)
+    build_cache.record_output(output_path, output_key)
 
     # Step 4: Validate duration
+    # (each message is printed in one call so concurrent devices don't interleave)
     duration = get_duration(output_path)
     if duration is not None:
-        print(f"\n  Duration: {duration:.1f}s", end="")
         if duration < 15:
-            print(f"  ⚠  WARNING: Under 15s minimum! ({duration:.1f}s)")
+            note = f"⚠  WARNING: Under 15s minimum! ({duration:.1f}s)"
         elif duration > 30:
-            print(f"  ⚠  WARNING: Over 30s maximum! ({duration:.1f}s)")
+            note = f"⚠  WARNING: Over 30s maximum! ({duration:.1f}s)"
         else:
-            print(f"  ✓  Within 15-30s requirement")
+            note = "✓  Within 15-30s requirement"
+        print(f"\n  {device_name} duration: {duration:.1f}s  {note}")
     else:
         print(f"\n  Could not verify duration (ffprobe not found?)")
 
@@ -322,14 +534,39 @@ def process_device(device_name, device_cfg):
     return True
 
 
+def traced_device(device_name, *args):
+    """process_device() recorded as one span in the run's trace."""
+    with trace_span(device_name, cat="device"):
+        return process_device(device_name, *args)
+
+
 def main():
     print("App Store Connect — App Preview Video Builder")
     print(f"Clip order: {', '.join(CLIP_ORDER)}")
     print(f"Encoding: H.264 {H264_PROFILE}@{H264_LEVEL}, {VIDEO_BITRATE}bps, {FPS}fps")
 
-    results = {}
-    for device_name, device_cfg in DEVICES.items():
-        results[device_name] = process_device(device_name, device_cfg)
+    # All devices' clips share one bounded encoder pool; each device runs
+    # in its own thread so it can concatenate as soon as its clips are done.
+    workers, threads = encoder_budget(len(CLIP_ORDER) * len(DEVICES))
+    print(f"Parallelism: {workers} concurrent encodes × {threads} threads")
+
+    print(f"Build cache: {build_cache.BUILD_DIR}")
+
+    with ThreadPoolExecutor(max_workers=workers) as encode_pool, \
+            ThreadPoolExecutor(max_workers=len(DEVICES)) as device_pool:
+        # Music is encoded to AAC once and shared by both devices, before
+        # any clip encode starts, so it never competes with the pool
+        music_path = encode_music()
+        futures = {
+            device_name: device_pool.submit(
+                traced_device, device_name, device_cfg, encode_pool, threads,
+                music_path)
+            for device_name, device_cfg in DEVICES.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    if TRACE_PATH:
+        write_trace(TRACE_PATH)
 
     # Summary
     print(f"\n{'=' * 55}")
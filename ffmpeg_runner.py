@@ -0,0 +1,165 @@
+"""
+Instrumented ffmpeg runner
+==========================
+Runs ffmpeg with `-progress pipe:1` and reports frame, fps, speed and
+encoded time while the encode is running. For each invocation it also
+records wall, user and sys CPU time and peak RSS. Every invocation, and
+any stage wrapped in trace_span(), is recorded as a Chrome trace event.
+write_trace() saves a whole run for chrome://tracing or ui.perfetto.dev,
+so the slowest clip or device can be found.
+"""
+
+import collections
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROGRESS_INTERVAL = 1.0  # seconds between live progress lines per invocation
+STDERR_TAIL_CHARS = 8000  # stderr kept for error reports
+
+_TRACE_EVENTS = []
+_TRACE_LOCK = threading.Lock()
+_T0 = time.perf_counter()
+
+
+class FFmpegResult:
+    """Outcome of one run_ffmpeg() call."""
+
+    def __init__(self, returncode, stderr, wall, user, sys_time, max_rss_mb):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.wall = wall
+        self.user = user
+        self.sys = sys_time
+        self.max_rss_mb = max_rss_mb
+
+
+def _now_us():
+    return (time.perf_counter() - _T0) * 1e6
+
+
+def _add_event(name, cat, start_us, dur_us, args):
+    event = {
+        "name": name, "cat": cat, "ph": "X",
+        "ts": start_us, "dur": dur_us,
+        "pid": os.getpid(), "tid": threading.get_native_id(),
+        "args": args,
+    }
+    with _TRACE_LOCK:
+        _TRACE_EVENTS.append(event)
+
+
+@contextmanager
+def trace_span(name, cat="stage", **args):
+    """Record the enclosed block as a trace event (e.g. one device or output)."""
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _add_event(name, cat, start, _now_us() - start, args)
+
+
+def write_trace(path):
+    """Write every recorded event as Chrome trace-event JSON."""
+    with _TRACE_LOCK:
+        events = list(_TRACE_EVENTS)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"  Trace ({len(events)} events) → {path}")
+
+
+def _rss_mb(ru_maxrss):
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else ru_maxrss / 1024
+
+
+def _format_progress(label, fields):
+    out_time = fields.get("out_time", "").split(".")[0] or "—"
+    fps = fields.get("fps", "?")
+    speed = fields.get("speed", "?").strip()
+    return f"    [{label}] time={out_time} frame={fields.get('frame', '?')} fps={fps} speed={speed}"
+
+
+def _feed_stdin(proc, feed, errors):
+    stdin = proc.stdin.buffer  # frames are bytes, not text
+    try:
+        feed(stdin)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its return code and log say why
+    except BaseException as e:
+        errors.append(e)
+        proc.kill()
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def run_ffmpeg(cmd, label, progress=True, feed=None):
+    """Run an ffmpeg command with live progress and resource accounting.
+
+    *cmd* starts with "ffmpeg"; progress options are inserted after it.
+    *feed*, if given, is called on a thread with ffmpeg's binary stdin
+    (e.g. for `-i pipe:0`), which is closed when it returns. An exception
+    raised by *feed* stops ffmpeg and is re-raised here.
+    Returns an FFmpegResult whose .stderr holds the tail of ffmpeg's log.
+    """
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + list(cmd[1:])
+    start_us = _now_us()
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            stdin=subprocess.PIPE if feed else None,
+                            text=True, errors="replace")
+
+    # Drain stderr on a thread so neither pipe can fill up and block ffmpeg
+    stderr_tail = collections.deque(maxlen=STDERR_TAIL_CHARS)
+    reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr.read()),
+                              daemon=True)
+    reader.start()
+
+    feed_errors = []
+    if feed:
+        writer = threading.Thread(target=_feed_stdin, args=(proc, feed, feed_errors),
+                                  daemon=True)
+        writer.start()
+
+    fields = {}
+    last_print = 0.0
+    for line in proc.stdout:
+        key, _, value = line.strip().partition("=")
+        fields[key] = value
+        if key == "progress":
+            now = time.perf_counter()
+            if progress and (value == "end" or now - last_print >= PROGRESS_INTERVAL):
+                print(_format_progress(label, fields))
+                last_print = now
+    reader.join()
+    if feed:
+        writer.join()
+
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        user, sys_time, max_rss = usage.ru_utime, usage.ru_stime, _rss_mb(usage.ru_maxrss)
+    else:
+        proc.wait()
+        user = sys_time = max_rss = None
+    wall = time.perf_counter() - start
+
+    _add_event(label, "ffmpeg", start_us, wall * 1e6, {
+        "returncode": proc.returncode,
+        "user_s": user, "sys_s": sys_time, "max_rss_mb": max_rss,
+        "speed": fields.get("speed", "").strip(),
+        "cmd": " ".join(cmd),
+    })
+    if user is not None:
+        print(f"    [{label}] wall {wall:.1f}s  user {user:.1f}s  sys {sys_time:.1f}s"
+              f"  peak RSS {max_rss:.0f} MB")
+    if feed_errors:
+        raise feed_errors[0]
+    return FFmpegResult(proc.returncode, "".join(stderr_tail), wall, user, sys_time, max_rss)
@@ -6,7 +6,29 @@ Generates localized promotional screenshots for iPhone and iPad.
 Custom Product Page focus: Teleprompter feature.
 
 Usage:
-    python3 generate_appstore_assets.py
+    python3 generate_appstore_assets.py [--jobs N] [--force] [--profile P]
+                                        [--draft-scale S]
+
+Options:
+    --jobs N     Render cards in N worker processes (default: CPU count).
+                 --jobs 1 renders serially in the main process.
+    --force      Re-render every card, ignoring the render cache.
+    --profile P  PNG output profile: draft, release (default) or max;
+                 see png_output.py. release recompresses every card, which
+                 can take several times as long as rendering it.
+    --draft-scale S
+                 Render every card at fraction S of full size (e.g. 0.25)
+                 into AppStoreDrafts/, plus AppStoreDrafts/contact_sheet.png
+                 with all cards on one page (a row per device and language,
+                 a column per clip), for quick copy review.
+    --no-montage Skip the review montages (AppStoreReview/<device>_montage.png,
+                 one row per language and one column per clip), which are
+                 otherwise assembled from the cards as they render.
+
+Cards whose inputs are unchanged since the last run (source frame, copy,
+teleprompter text, colours, fonts, sizes and this script) are skipped; see
+AppStoreAssets/.render_cache.json. Their montage tiles are kept in
+AppStoreAssets/.montage_tiles/, so skipped cards are never re-read.
 
 Output:
     AppStoreAssets/
@@ -14,18 +36,32 @@ Output:
       iPad/<lang>/    (4 images per language)
 """
 
+import argparse
+import hashlib
+import json
+import math
 import subprocess
 import os
 import sys
 import platform
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+import backgrounds
+import montage
+import png_output
+
 # ─────────────────────────────────────────────
 # PATHS
 # ─────────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PORTRAIT_DIR = os.path.join(BASE_DIR, "Portrait")
 OUTPUT_DIR = os.path.join(BASE_DIR, "AppStoreAssets")
+CACHE_MANIFEST = os.path.join(OUTPUT_DIR, ".render_cache.json")
+MONTAGE_TILE_DIR = os.path.join(OUTPUT_DIR, ".montage_tiles")  # reduced cards, by cache key
 
 CLIPS = ["woman_1", "man_1", "woman_2", "man_2"]
 
@@ -56,6 +92,17 @@ PHONE_ISLAND_W_PCT = 0.30  # Dynamic island width as % of screen
 PHONE_ISLAND_H_PCT = 0.014  # Dynamic island height as % of screen
 PHONE_BORDER_PCT = 0.014  # Colored border as % of phone width
 
+# ─────────────────────────────────────────────
+# DRAFT RENDERING  (--draft-scale)
+# ─────────────────────────────────────────────
+DRAFT_SCALE = 1.0  # fixed pixel sizes below are multiplied by this via px()
+DRAFT_DIR = os.path.join(BASE_DIR, "AppStoreDrafts")
+CONTACT_SHEET = os.path.join(DRAFT_DIR, "contact_sheet.png")  # see montage.py
+
+# Per-device lang x clip review grids, assembled while rendering (see montage.py)
+MONTAGE_DIR = os.path.join(BASE_DIR, "AppStoreReview")
+MONTAGE_LABEL_SIZE = 24  # label font size, for montages and the contact sheet
+
 # ─────────────────────────────────────────────
 # VISUAL DESIGN
 # ─────────────────────────────────────────────
@@ -77,6 +124,20 @@ LATIN_FONT = None
 LATIN_FONT_INDEX = 0
 _LANG_CJK_FONTS = {}  # lang -> (font_path, font_index)
 
+# Per-face family/style/weight for every probed font file, keyed by path and
+# invalidated by mtime/size, so detect_fonts() needn't open every face each run
+FONT_INDEX_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "demoscope", "font_index.json",
+)
+FONT_INDEX_MAX_FACES = 50  # faces probed per font collection
+_FONT_INDEX = None  # loaded lazily by font_faces()
+_FONT_INDEX_DIRTY = False
+
+FONT_CACHE_SIZE = 64  # loaded FreeTypeFont objects kept per process
+_FONT_CACHE = OrderedDict()  # (font_path, font_index, size) -> FreeTypeFont
+FONT_CACHE_STATS = {"hits": 0, "misses": 0}
+
 # ─────────────────────────────────────────────
 # LOCALIZED MARKETING COPY
 # ─────────────────────────────────────────────
@@ -348,6 +409,74 @@ LANGUAGES = list(COPY.keys())
 # HELPERS
 # ─────────────────────────────────────────────
 
+def _weight_score(family, style):
+    """Score how bold a face is; higher prefers Bold / Semibold weights."""
+    if "Bold" in style:
+        return 10
+    if "Semibold" in style or "SemiBold" in style or "Demi" in style:
+        return 8
+    if "W7" in family:
+        return 9
+    if "W6" in family:
+        return 7
+    if "Medium" in style:
+        return 5
+    return 0
+
+
+def _load_font_index():
+    global _FONT_INDEX
+    try:
+        with open(FONT_INDEX_PATH, encoding="utf-8") as f:
+            _FONT_INDEX = json.load(f)
+    except (OSError, ValueError):
+        _FONT_INDEX = {}
+    return _FONT_INDEX
+
+
+def save_font_index():
+    """Write the font index back to disk if any entry was (re)scanned."""
+    global _FONT_INDEX_DIRTY
+    if not _FONT_INDEX_DIRTY:
+        return
+    try:
+        os.makedirs(os.path.dirname(FONT_INDEX_PATH), exist_ok=True)
+        tmp = FONT_INDEX_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_FONT_INDEX, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, FONT_INDEX_PATH)
+        _FONT_INDEX_DIRTY = False
+    except OSError as e:
+        print(f"  WARNING: could not write font index: {e}")
+
+
+def font_faces(path):
+    """Return [{"family", "style", "weight"}, ...] for each face in a font file.
+
+    Served from the on-disk font index while the file's mtime and size are
+    unchanged; otherwise every face is opened once and the entry refreshed.
+    """
+    global _FONT_INDEX_DIRTY
+    index = _FONT_INDEX if _FONT_INDEX is not None else _load_font_index()
+    st = os.stat(path)
+    entry = index.get(path)
+    if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+        return entry["faces"]
+
+    faces = []
+    for i in range(FONT_INDEX_MAX_FACES):
+        try:
+            f = ImageFont.truetype(path, 20, index=i)
+        except (OSError, IOError):
+            break
+        family, style = f.getname()
+        faces.append({"family": family, "style": style,
+                      "weight": _weight_score(family, style)})
+    index[path] = {"mtime": st.st_mtime, "size": st.st_size, "faces": faces}
+    _FONT_INDEX_DIRTY = True
+    return faces
+
+
 def _find_ttc_index(ttc_path, bold=True, name_contains=None):
     """Return the index of a matching variant inside a .ttc font collection.
 
@@ -356,26 +485,11 @@ def _find_ttc_index(ttc_path, bold=True, name_contains=None):
     Returns 0 as fallback.
     """
     best, best_score = 0, -1
-    for i in range(50):
-        try:
-            f = ImageFont.truetype(ttc_path, 20, index=i)
-        except (OSError, IOError):
-            break
-        family, style = f.getname()
+    for i, face in enumerate(font_faces(ttc_path)):
+        family = face["family"]
         if name_contains and name_contains not in family:
             continue
-        score = 0
-        if bold:
-            if "Bold" in style:
-                score += 10
-            elif "Semibold" in style or "SemiBold" in style or "Demi" in style:
-                score += 8
-            elif "W7" in family:
-                score += 9
-            elif "W6" in family:
-                score += 7
-            elif "Medium" in style:
-                score += 5
+        score = face["weight"] if bold else 0
         if "Mono" in family:
             score -= 20
         if score > best_score:
@@ -423,6 +537,8 @@ def detect_fonts():
     else:
         _detect_linux_cjk()
 
+    save_font_index()
+
 
 def _detect_macos_cjk():
     """Detect CJK fonts on macOS using built-in system fonts."""
@@ -474,17 +590,13 @@ def _detect_linux_cjk():
 
     if cjk_path is not None:
         lang_map = {"JP": "ja", "KR": "ko", "SC": "zh-Hans", "TC": "zh-Hant"}
-        for i in range(30):
-            try:
-                font = ImageFont.truetype(cjk_path, 20, index=i)
-                family = font.getname()[0]
-                if "Mono" in family:
-                    continue
-                for code, lang_key in lang_map.items():
-                    if code in family and lang_key not in _LANG_CJK_FONTS:
-                        _LANG_CJK_FONTS[lang_key] = (cjk_path, i)
-            except (OSError, IOError):
-                break
+        for i, face in enumerate(font_faces(cjk_path)[:30]):
+            family = face["family"]
+            if "Mono" in family:
+                continue
+            for code, lang_key in lang_map.items():
+                if code in family and lang_key not in _LANG_CJK_FONTS:
+                    _LANG_CJK_FONTS[lang_key] = (cjk_path, i)
         print(f"  CJK font: {cjk_path}")
         print(f"  CJK languages detected: {list(_LANG_CJK_FONTS.keys())}")
 
@@ -534,75 +646,417 @@ def _detect_linux_cjk():
         print(f"  WARNING: No fonts found for: {missing}. CJK text may not render.")
 
 
-def extract_frame(video_path, timestamp="0:00"):
-    """Extract a frame at the given min:sec timestamp as a PIL Image."""
-    tmp = video_path + ".tmp_frame.png"
+def parse_timestamp(timestamp):
+    """Convert a [h:]min:sec timestamp string to seconds."""
+    seconds = 0.0
+    for part in str(timestamp).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def probe_video_size(video_path):
+    """Return the displayed (width, height) of a video's first stream.
+
+    Accounts for rotation metadata, since ffmpeg auto-rotates decoded frames.
+    """
     cmd = [
-        "ffmpeg", "-y",
-        "-ss", timestamp,
-        "-i", video_path,
-        "-vframes", "1", "-q:v", "1", tmp,
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=width,height:stream_tags=rotate:stream_side_data=rotation",
+        "-of", "json",
+        video_path,
     ]
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
-        raise RuntimeError(f"ffmpeg failed: {result.stderr[-500:]}")
-    img = Image.open(tmp).convert("RGB")
-    os.remove(tmp)
-    return img
+        raise RuntimeError(f"ffprobe failed: {result.stderr[-500:]}")
+    stream = json.loads(result.stdout)["streams"][0]
+    w, h = int(stream["width"]), int(stream["height"])
 
+    rotation = stream.get("tags", {}).get("rotate", 0)
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    if int(float(rotation)) % 180 != 0:
+        w, h = h, w
+    return w, h
 
-def gradient_bg(w, h, color_top, color_bottom):
-    """Create a vertical gradient background."""
-    col = Image.new("RGB", (1, h))
-    px = col.load()
-    for y in range(h):
-        t = y / max(h - 1, 1)
-        px[0, y] = tuple(int(a + (b - a) * t) for a, b in zip(color_top, color_bottom))
-    return col.resize((w, h), Image.NEAREST)
+
+def extract_frames(video_path, timestamps):
+    """Extract frames at several min:sec timestamps as PIL Images.
+
+    Raw RGB frames are piped over stdout straight into PIL, so nothing is
+    written to disk. A single timestamp uses a fast input seek; several
+    timestamps are grabbed in one decode with a select filter that keeps
+    the first frame at or after each timestamp.
+    """
+    w, h = probe_video_size(video_path)
+    wanted = sorted({parse_timestamp(ts) for ts in timestamps})
+
+    cmd = ["ffmpeg", "-v", "error"]
+    if len(wanted) == 1:
+        cmd += ["-ss", str(wanted[0]), "-i", video_path]
+    else:
+        terms = [
+            "eq(n,0)" if t <= 0 else f"gte(t,{t})*lt(prev_t,{t})"
+            for t in wanted
+        ]
+        cmd += [
+            "-i", video_path,
+            "-vf", f"select='{'+'.join(terms)}'",
+            "-vsync", "0",
+        ]
+    cmd += [
+        "-frames:v", str(len(wanted)),
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace")
+        raise RuntimeError(f"ffmpeg failed: {stderr[-500:]}")
+
+    frame_bytes = w * h * 3
+    data = memoryview(result.stdout)
+    n_frames = len(data) // frame_bytes
+    if n_frames < len(wanted):
+        raise RuntimeError(
+            f"ffmpeg returned {n_frames} of {len(wanted)} frames for {video_path}"
+        )
+    by_time = {
+        t: Image.frombuffer("RGB", (w, h), data[i * frame_bytes:(i + 1) * frame_bytes],
+                            "raw", "RGB", 0, 1)
+        for i, t in enumerate(wanted)
+    }
+    return [by_time[parse_timestamp(ts)] for ts in timestamps]
+
+
+def extract_frame(video_path, timestamp="0:00"):
+    """Extract a frame at the given min:sec timestamp as a PIL Image."""
+    return extract_frames(video_path, [timestamp])[0]
+
+
+def iter_frames(video_path, size=None, fps=None, start=0, duration=None):
+    """Yield a video's frames one at a time as RGB PIL Images.
+
+    Decoded rgb24 frames are read from an ffmpeg rawvideo pipe into a single
+    reused buffer, so memory stays constant however long the clip is. A
+    yielded image may share that buffer, so it is only valid until the next
+    frame is requested; copy or convert it to keep it.
+
+    *size* (w, h) has ffmpeg scale the frames to cover that size and
+    centre-crop them, as scale_to_cover() does. *fps* resamples to a
+    constant frame rate. *start* and *duration* are in seconds.
+    """
+    src_w, src_h = probe_video_size(video_path)
+    filters = []
+    if fps:
+        filters.append(f"fps={fps}")
+    if size is not None and size != (src_w, src_h):
+        w, h = size
+        vid_w, vid_h, left, top = cover_geometry(src_w, src_h, w, h)
+        filters += [f"scale={vid_w}:{vid_h}:flags=lanczos", f"crop={w}:{h}:{left}:{top}"]
+    else:
+        w, h = src_w, src_h
+
+    cmd = ["ffmpeg", "-v", "error"]
+    if start:
+        cmd += ["-ss", str(start)]
+    cmd += ["-i", video_path]
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    if filters:
+        cmd += ["-vf", ",".join(filters)]
+    cmd += ["-an", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+
+    buf = bytearray(w * h * 3)
+    view = memoryview(buf)
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+        try:
+            while True:
+                got = 0
+                while got < len(buf):
+                    n = proc.stdout.readinto(view[got:])
+                    if not n:
+                        break
+                    got += n
+                if got < len(buf):
+                    break
+                yield Image.frombuffer("RGB", (w, h), buf, "raw", "RGB", 0, 1)
+        finally:
+            if proc.poll() is None and got == len(buf):
+                proc.kill()  # closed early by the consumer
+            proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            errors.seek(0)
+            stderr = errors.read().decode("utf-8", "replace")
+            raise RuntimeError(f"ffmpeg failed: {stderr[-500:]}")
+
+
+def gradient_bg(w, h, color_top, color_bottom, shape="linear", mode="RGB"):
+    """Create a gradient background (vertical by default, see backgrounds.py)."""
+    return backgrounds.gradient(shape, w, h, [color_top, color_bottom], mode=mode)
+
+
+SCREEN_CACHE_SIZE = 4  # corner masks / shades kept per process: one per screen size in use
+_CORNER_MASKS = OrderedDict()  # (w, h, radius) -> L mask
+
+
+def corner_mask(w, h, radius):
+    """Return the shared rounded-rectangle mask for a w x h image (do not modify)."""
+    key = (w, h, radius)
+    mask = _CORNER_MASKS.get(key)
+    if mask is not None:
+        _CORNER_MASKS.move_to_end(key)
+        return mask
+    mask = Image.new("L", (w, h), 0)
+    ImageDraw.Draw(mask).rounded_rectangle(
+        [(0, 0), (w - 1, h - 1)], radius=radius, fill=255
+    )
+    return lru_put(_CORNER_MASKS, key, mask, SCREEN_CACHE_SIZE)
 
 
 def round_corners(img, radius):
     """Add rounded corners, returning an RGBA image."""
     img = img.convert("RGBA")
-    mask = Image.new("L", img.size, 0)
-    ImageDraw.Draw(mask).rounded_rectangle(
-        [(0, 0), (img.width - 1, img.height - 1)], radius=radius, fill=255
-    )
-    img.putalpha(mask)
+    img.putalpha(corner_mask(img.width, img.height, radius))
     return img
 
 
+def load_font(path, size, index=0):
+    """Return a FreeTypeFont from the per-process LRU registry.
+
+    Each (path, index, size) is loaded once and reused across cards, but
+    every new size still opens the file again: Pillow can't resize a face.
+    The file's bytes are deliberately not cached either. Pillow copies the
+    buffer into every face loaded from memory, so each cached size would
+    hold a full copy of the font (tens of MB for a CJK .ttc), and loading
+    from a path is faster anyway (~0.07 ms vs ~0.6 ms per face).
+    """
+    key = (path, index, size)
+    font = _FONT_CACHE.get(key)
+    if font is not None:
+        FONT_CACHE_STATS["hits"] += 1
+        _FONT_CACHE.move_to_end(key)
+        return font
+
+    FONT_CACHE_STATS["misses"] += 1
+    font = ImageFont.truetype(path, size, index=index)
+    _FONT_CACHE[key] = font
+    while len(_FONT_CACHE) > FONT_CACHE_SIZE:
+        _FONT_CACHE.popitem(last=False)
+    return font
+
+
 def get_font(lang, size):
     """Return the correct bold font for a language."""
     if lang in _LANG_CJK_FONTS:
         path, idx = _LANG_CJK_FONTS[lang]
-        return ImageFont.truetype(path, size, index=idx)
-    return ImageFont.truetype(LATIN_FONT, size, index=LATIN_FONT_INDEX)
+        return load_font(path, size, idx)
+    return load_font(LATIN_FONT, size, LATIN_FONT_INDEX)
+
+
+SHADOW_BLUR_DOWNSCALE = 4  # max factor large blurs are computed at reduced size
+
+
+def soft_blur(img, radius):
+    """Gaussian blur, computed at reduced resolution for large radii.
+
+    A wide Gaussian has no fine detail to lose, so blurring a downscaled
+    copy and upsampling it looks the same at a fraction of the cost.
+    """
+    factor = min(SHADOW_BLUR_DOWNSCALE, max(1, int(radius // 3)))
+    if factor == 1:
+        return img.filter(ImageFilter.GaussianBlur(radius))
+    small_size = (max(img.width // factor, 1), max(img.height // factor, 1))
+    small = img.resize(small_size, Image.BOX)
+    small = small.filter(ImageFilter.GaussianBlur(radius / factor))
+    return small.resize(img.size, Image.BILINEAR)
+
 
+def composite_region(canvas, layer, pos):
+    """Alpha-composite *layer* onto RGBA *canvas* at *pos*, in place.
 
-def composite_with_shadow(canvas, img, pos, offset=10, blur=20, opacity=60):
-    """Paste img onto canvas with a soft drop shadow."""
-    canvas = canvas.convert("RGBA")
+    Only the overlapping box is blended; parts of *layer* that fall
+    outside the canvas are clipped.
+    """
+    x, y = pos
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + layer.width, canvas.width)
+    bottom = min(y + layer.height, canvas.height)
+    if right <= left or bottom <= top:
+        return canvas
+    if (left, top, right, bottom) != (x, y, x + layer.width, y + layer.height):
+        layer = layer.crop((left - x, top - y, right - x, bottom - y))
+    canvas.alpha_composite(layer, (left, top))
+    return canvas
+
+
+def make_shadow(img, blur=20, opacity=60):
+    """Return the blurred drop-shadow buffer for img (padded by blur * 3)."""
     pad = blur * 3
-    sbuf = Image.new("RGBA", (img.width + 2 * pad, img.height + 2 * pad), (0, 0, 0, 0))
-    sfill = Image.new("RGBA", img.size, (0, 0, 0, opacity))
+    size = (img.width + 2 * pad, img.height + 2 * pad)
+    # The shadow is black, so only its alpha needs blurring
     if img.mode == "RGBA":
-        sfill.putalpha(img.split()[3])
-    sbuf.paste(sfill, (pad, pad))
-    sbuf = sbuf.filter(ImageFilter.GaussianBlur(blur))
+        alpha = img.getchannel("A")
+    else:
+        alpha = Image.new("L", img.size, opacity)
+    mask = Image.new("L", size, 0)
+    mask.paste(alpha, (pad, pad))
+
+    sbuf = Image.new("RGBA", size, (0, 0, 0, 0))
+    sbuf.putalpha(soft_blur(mask, blur))
+    return sbuf
+
+
+def composite_with_shadow(canvas, img, pos, offset=10, blur=20, opacity=60,
+                          shadow=None):
+    """Paste img onto canvas with a soft drop shadow.
+
+    *shadow* may be a precomputed make_shadow(img, blur, opacity) buffer.
+    An RGBA canvas is modified in place.
+    """
+    if canvas.mode != "RGBA":
+        canvas = canvas.convert("RGBA")
+    pad = blur * 3
+    sbuf = shadow if shadow is not None else make_shadow(img, blur, opacity)
 
-    shadow_layer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
     sx, sy = pos[0] + offset - pad, pos[1] + offset - pad
-    shadow_layer.paste(sbuf, (sx, sy))
-    canvas = Image.alpha_composite(canvas, shadow_layer)
+    composite_region(canvas, sbuf, (sx, sy))
     canvas.paste(img, pos, img)
     return canvas
 
 
+# ─────────────────────────────────────────────
+# TEXT FITTING
+# ─────────────────────────────────────────────
+MIN_FONT_SIZE = 8
+TEXT_WIDTH_CACHE_SIZE = 4096  # measured (font, size, string) widths per process
+_TEXT_WIDTH_CACHE = OrderedDict()  # (font_path, font_index, size, text) -> pixel width
+
+
+def text_width(lang, text, size):
+    """Pixel width of *text* in the language's font at *size* (memoized)."""
+    path, idx = _LANG_CJK_FONTS.get(lang, (LATIN_FONT, LATIN_FONT_INDEX))
+    key = (path, idx, size, text)
+    width = _TEXT_WIDTH_CACHE.get(key)
+    if width is not None:
+        _TEXT_WIDTH_CACHE.move_to_end(key)
+        return width
+    bbox = get_font(lang, size).getbbox(text)
+    return lru_put(_TEXT_WIDTH_CACHE, key, bbox[2] - bbox[0], TEXT_WIDTH_CACHE_SIZE)
+
+
+def px(n):
+    """Scale a fixed pixel size (clamp, blur radius, offset) by DRAFT_SCALE.
+
+    Layout is proportional to the card size, so only these absolute values
+    need scaling for a draft render to look like the full one.
+    """
+    return max(1, round(n * DRAFT_SCALE))
+
+
+def fit_font_size(lang, lines, max_w, max_size, min_size=None):
+    """Return the largest size <= max_size at which every line fits max_w.
+
+    Widths scale roughly linearly with size, so the first probe is the
+    linear estimate; a binary search then settles hinting and kerning
+    differences in a handful of measurements.
+    """
+    lines = [line.strip() for line in lines if line.strip()]
+    if not lines:
+        return max_size
+    if min_size is None:
+        min_size = px(MIN_FONT_SIZE)
+
+    def widest(size):
+        return max(text_width(lang, line, size) for line in lines)
+
+    w_max = widest(max_size)
+    if w_max <= max_w:
+        return max_size
+
+    lo, hi = min_size, max_size - 1  # invariant: answer in [lo, hi]
+    guess = int(max_size * max_w / w_max)
+    while lo < hi:
+        mid = min(max(guess, lo + 1), hi) if guess else (lo + hi + 1) // 2
+        guess = None
+        if widest(mid) <= max_w:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
 # ─────────────────────────────────────────────
 # TEXT RENDERING
 # ─────────────────────────────────────────────
 
+TEXT_SPRITE_CACHE_SIZE = 256  # rasterized strings / blurred shadows per process
+_TEXT_SPRITES = OrderedDict()  # (font, text, anchor, align) -> (L mask, (dx, dy))
+_TEXT_SHADOWS = OrderedDict()  # sprite key + (color, blur, pad) -> RGBA buffer
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def lru_put(cache, key, value, limit=TEXT_SPRITE_CACHE_SIZE):
+    """Store *value* in an OrderedDict LRU, evicting the oldest entries past *limit*."""
+    cache[key] = value
+    while len(cache) > limit:
+        cache.popitem(last=False)
+    return value
+
+
+def _sprite_key(text, font, anchor, align):
+    return (font.path, font.index, font.size, text, anchor, align)
+
+
+def text_sprite(text, font, anchor="la", align="left"):
+    """Rasterize *text* once into an L alpha mask, cached per font and string.
+
+    Returns (mask, (dx, dy)): the mask's top-left sits at (x + dx, y + dy)
+    when the text is anchored at (x, y). Pasting a colour through the mask
+    gives the same pixels as ImageDraw.text.
+    """
+    key = _sprite_key(text, font, anchor, align)
+    cached = _TEXT_SPRITES.get(key)
+    if cached is not None:
+        _TEXT_SPRITES.move_to_end(key)
+        return cached
+
+    l, t, r, b = _MEASURE_DRAW.textbbox((0, 0), text, font=font,
+                                        anchor=anchor, align=align)
+    # Multiline text measures in fractional pixels; round the box outward
+    l, t, r, b = math.floor(l), math.floor(t), math.ceil(r), math.ceil(b)
+    mask = Image.new("L", (max(r - l, 1), max(b - t, 1)), 0)
+    ImageDraw.Draw(mask).text((-l, -t), text, font=font, fill=255,
+                              anchor=anchor, align=align)
+    return lru_put(_TEXT_SPRITES, key, (mask, (l, t)))
+
+
+def text_shadow(text, font, shadow_color, blur, pad, anchor="la", align="left"):
+    """Blurred RGBA shadow of a text sprite, padded by *pad*, cached per sprite.
+
+    Returns (buffer, (dx, dy)) positioned like text_sprite().
+    """
+    key = _sprite_key(text, font, anchor, align) + (shadow_color, blur, pad)
+    cached = _TEXT_SHADOWS.get(key)
+    if cached is not None:
+        _TEXT_SHADOWS.move_to_end(key)
+        return cached
+
+    mask, (dx, dy) = text_sprite(text, font, anchor, align)
+    sbuf = Image.new("RGBA", (mask.width + 2 * pad, mask.height + 2 * pad), (0, 0, 0, 0))
+    sbuf.paste(shadow_color, (pad, pad), mask)
+    sbuf = soft_blur(sbuf, blur)
+    return lru_put(_TEXT_SHADOWS, key, (sbuf, (dx - pad, dy - pad)))
+
+
+def paste_text(img, pos, text, font, fill, anchor="la", align="left"):
+    """Draw text at integer *pos* in place, via the cached sprite mask."""
+    mask, (dx, dy) = text_sprite(text, font, anchor, align)
+    img.paste(fill, (pos[0] + dx, pos[1] + dy), mask)
+
+
 def draw_label_text(canvas, center_x, start_y, text, font,
                     text_fill=TEXT_COLOR, block_fill=LABEL_BLOCK_COLOR,
                     block_radius=14, pad_x=24, pad_y=8, line_gap=10):
@@ -630,8 +1084,7 @@ def draw_label_text(canvas, center_x, start_y, text, font,
         )
 
         # Text on top of block
-        draw.text((center_x, y_cursor), line, font=font,
-                  fill=text_fill, anchor="mt")
+        paste_text(canvas, (center_x, y_cursor), line, font, text_fill, anchor="mt")
 
         y_cursor = by1 + line_gap
 
@@ -642,30 +1095,23 @@ def draw_text_with_shadow(canvas, pos, text, font,
                           fill=TEXT_COLOR, shadow_color=TEXT_SHADOW,
                           shadow_offset=(0, 6), shadow_blur=10,
                           anchor="mm", align="center"):
-    """Draw text with a soft drop shadow."""
-    canvas = canvas.convert("RGBA")
+    """Draw text with a soft drop shadow.
 
-    tmp_draw = ImageDraw.Draw(canvas)
-    bbox = tmp_draw.textbbox(pos, text, font=font, anchor=anchor, align=align)
+    The string is rasterized once (text_sprite) and its blurred shadow is
+    cached, so repeated strings cost only the composites. An RGBA canvas
+    is modified in place.
+    """
+    if canvas.mode != "RGBA":
+        canvas = canvas.convert("RGBA")
 
     pad = shadow_blur * 3 + max(abs(shadow_offset[0]), abs(shadow_offset[1])) + 4
-    bx = int(max(bbox[0] - pad, 0))
-    by = int(max(bbox[1] - pad, 0))
-    bw = int(min(bbox[2] + pad, canvas.width) - bx)
-    bh = int(min(bbox[3] + pad, canvas.height) - by)
+    sbuf, (dx, dy) = text_shadow(text, font, shadow_color, shadow_blur, pad,
+                                 anchor=anchor, align=align)
 
-    sbuf = Image.new("RGBA", (bw, bh), (0, 0, 0, 0))
-    sd = ImageDraw.Draw(sbuf)
-    local_pos = (pos[0] - bx + shadow_offset[0], pos[1] - by + shadow_offset[1])
-    sd.text(local_pos, text, font=font, fill=shadow_color, anchor=anchor, align=align)
-    sbuf = sbuf.filter(ImageFilter.GaussianBlur(shadow_blur))
+    composite_region(canvas, sbuf,
+                     (pos[0] + shadow_offset[0] + dx, pos[1] + shadow_offset[1] + dy))
 
-    slayer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    slayer.paste(sbuf, (bx, by))
-    canvas = Image.alpha_composite(canvas, slayer)
-
-    draw = ImageDraw.Draw(canvas)
-    draw.text(pos, text, font=font, fill=fill, anchor=anchor, align=align)
+    paste_text(canvas, pos, text, font, fill, anchor=anchor, align=align)
     return canvas
 
 
@@ -673,87 +1119,135 @@ def draw_text_with_shadow(canvas, pos, text, font,
 # PHONE MOCKUP & TELEPROMPTER
 # ─────────────────────────────────────────────
 
-def create_screen_content(video_frame, screen_w, screen_h, lang, clip):
-    """Build screen content: video scaled to cover screen + teleprompter overlay."""
-    scale_w = screen_w / video_frame.width
-    scale_h = screen_h / video_frame.height
-    scale = max(scale_w, scale_h)
-
-    vid_w = int(video_frame.width * scale)
-    vid_h = int(video_frame.height * scale)
-
-    scaled = video_frame.resize((vid_w, vid_h), Image.LANCZOS)
+def cover_geometry(src_w, src_h, screen_w, screen_h):
+    """Return (vid_w, vid_h, left, top): the source scaled to cover the screen
+    and the offset of the centred screen-sized crop within it."""
+    scale = max(screen_w / src_w, screen_h / src_h)
+    vid_w = int(src_w * scale)
+    vid_h = int(src_h * scale)
 
     # Centre-crop to screen dimensions so no black bars remain
     left = (vid_w - screen_w) // 2
     top = (vid_h - screen_h) // 2
-    screen = scaled.crop((left, top, left + screen_w, top + screen_h)).convert("RGBA")
+    return vid_w, vid_h, left, top
 
-    screen = add_teleprompter_overlay(screen, vid_h, lang, clip)
+
+def cover_box(src_w, src_h, screen_w, screen_h):
+    """Source-pixel box that, resized to the screen, covers it centre-cropped.
+
+    Equivalent to scaling the source to cover the screen and cropping the
+    centre, but expressed as one box so a single resample produces the
+    screen directly, without the full-size intermediate.
+    """
+    vid_w, vid_h, left, top = cover_geometry(src_w, src_h, screen_w, screen_h)
+    sx, sy = vid_w / src_w, vid_h / src_h
+    return (left / sx, top / sy, (left + screen_w) / sx, (top + screen_h) / sy)
+
+
+def scale_to_cover(video_frame, screen_w, screen_h):
+    """Scale the video frame to cover the screen and centre-crop it (RGBA)."""
+    box = cover_box(video_frame.width, video_frame.height, screen_w, screen_h)
+    return video_frame.resize((screen_w, screen_h), Image.LANCZOS, box=box).convert("RGBA")
+
+
+def create_screen_content(video_frame, screen_w, screen_h, lang, clip):
+    """Build screen content: video scaled to cover screen + teleprompter overlay."""
+    screen = scale_to_cover(video_frame, screen_w, screen_h)
+    screen = add_teleprompter_overlay(screen, screen_h, lang, clip)
     return screen
 
 
 def add_teleprompter_overlay(screen, video_bottom, lang, clip):
     """Overlay a teleprompter UI centred at the vertical midpoint."""
-    w, h = screen.size
+    screen = add_teleprompter_shade(screen)
+    draw_teleprompter_text(screen, lang, clip)
+    return screen
+
+
+_SHADES = OrderedDict()  # (w, h) -> Gaussian shade overlay, up to SCREEN_CACHE_SIZE
+
+
+def add_teleprompter_shade(screen):
+    """Darken the screen with a Gaussian band (language-independent)."""
+    overlay = _SHADES.get(screen.size)
+    if overlay is not None:
+        _SHADES.move_to_end(screen.size)
+    else:
+        # Full-screen Gaussian overlay — peaks at vertical midpoint, no hard edges
+        overlay = lru_put(_SHADES, screen.size, backgrounds.gaussian_band(
+            *screen.size,
+            center=0.50,  # peak at screen midpoint
+            sigma=0.22,  # controls how wide the darkening spreads
+            peak_alpha=130,  # max darkness at center
+        ), SCREEN_CACHE_SIZE)
+    return Image.alpha_composite(screen, overlay)
 
-    # Full-screen Gaussian overlay — peaks at vertical midpoint, no hard edges
-    import math
-    center = 0.50  # peak at screen midpoint
-    sigma = 0.22  # controls how wide the darkening spreads
-    peak_alpha = 130  # max darkness at center
 
-    col = Image.new("RGBA", (1, h))
-    for y in range(h):
-        t = y / max(h - 1, 1)
-        alpha = int(peak_alpha * math.exp(-0.5 * ((t - center) / sigma) ** 2))
-        col.putpixel((0, y), (0, 0, 0, alpha))
-    overlay = col.resize((w, h), Image.NEAREST)
-    screen = Image.alpha_composite(screen, overlay)
+def teleprompter_font_sizes(lang, lines, w, h, active=1):
+    """Return (line size, active line size) for a w x h screen.
 
+    The active line leaves room for its marker bar. With *active* None both
+    sizes fit every line, so the text keeps its size while it scrolls.
+    """
+    if active is None:
+        others = actives = lines
+    else:
+        others = [line for i, line in enumerate(lines) if i != active]
+        actives = lines[active:active + 1]
+    line_cap, active_cap = int(h * 0.022), int(h * 0.027)
+    line_size = fit_font_size(lang, others, int(w * 0.90), line_cap)
+    active_size = fit_font_size(lang, actives, int(w * 0.84), active_cap)
+    # When the active line has to shrink more than the others, they shrink
+    # with it, so it stays the larger by the same line_cap:active_cap ratio
+    return min(line_size, active_size * line_cap // active_cap), active_size
+
+
+def draw_teleprompter_text(screen, lang, clip, position=1, sizes=None):
+    """Draw the teleprompter lines in place, scrolled to *position*.
+
+    *position* is a (possibly fractional) line index centred at the vertical
+    midpoint; the nearest line is highlighted. *sizes* may be precomputed
+    teleprompter_font_sizes() for the screen.
+    """
+    w, h = screen.size
     draw = ImageDraw.Draw(screen)
     lines = PROMPTER_TEXT[clip][lang]
+    active = min(max(int(position + 0.5), 0), len(lines) - 1)
 
-    base_sz = int(h * 0.022)
-    active_sz = int(h * 0.027)
-
-    line_font = get_font(lang, base_sz)
-    active_font = get_font(lang, active_sz)
+    if sizes is None:
+        sizes = teleprompter_font_sizes(lang, lines, w, h, active)
+    line_font = get_font(lang, sizes[0])
+    active_font = get_font(lang, sizes[1])
 
     cx = w // 2
     line_gap = int(h * 0.058)
-    # Centre the active line (line 1) at the vertical midpoint
-    text_top = h // 2 - line_gap
 
     for i, line in enumerate(lines):
-        y = text_top + i * line_gap
-        if i == 1:
-            draw.text((cx, y), line, font=active_font,
-                      fill=(255, 255, 255, 175), anchor="mm", align="center")
+        y = h // 2 + round((i - position) * line_gap)
+        if i == active:
+            paste_text(screen, (cx, y), line, active_font,
+                       (255, 255, 255, 175), anchor="mm", align="center")
             bbox = draw.textbbox((cx, y), line, font=active_font, anchor="mm")
             bar_x = bbox[0] - int(w * 0.025)
-            bar_w = max(int(w * 0.006), 3)
+            bar_w = max(int(w * 0.006), px(3))
             draw.rounded_rectangle(
-                [(bar_x, bbox[1] + 2), (bar_x + bar_w, bbox[3] - 2)],
+                [(bar_x, bbox[1] + px(2)), (bar_x + bar_w, bbox[3] - px(2))],
                 radius=bar_w // 2,
                 fill=(255, 255, 255, 130),
             )
         else:
-            draw.text((cx, y), line, font=line_font,
-                      fill=(255, 255, 255, 55), anchor="mm", align="center")
+            paste_text(screen, (cx, y), line, line_font,
+                       (255, 255, 255, 55), anchor="mm", align="center")
 
     return screen
 
 
-def build_phone_mockup(screen_content, phone_w, phone_h, bezel, border_color):
-    """Wrap screen content in an iPhone frame with a colored accent border."""
-    screen_w = phone_w - 2 * bezel
-    screen_h = phone_h - 2 * bezel
+def build_phone_shell(phone_w, phone_h, border_color):
+    """Draw the colored border and dark phone body, without screen content."""
     body_r = int(phone_w * PHONE_BODY_RADIUS_PCT)
-    screen_r = int(body_r * 0.85)
 
     # Colored border wraps the phone body
-    border_w = max(int(phone_w * PHONE_BORDER_PCT), 3)
+    border_w = max(int(phone_w * PHONE_BORDER_PCT), px(3))
     total_w = phone_w + 2 * border_w
     total_h = phone_h + 2 * border_w
     border_r = body_r + border_w
@@ -775,50 +1269,148 @@ def build_phone_mockup(screen_content, phone_w, phone_h, bezel, border_color):
         radius=body_r,
         fill=(*PHONE_BODY_COLOR, 255),
     )
+    return phone
+
+
+def build_phone_mockup(screen_content, phone_w, phone_h, bezel, border_color,
+                       shell=None):
+    """Wrap screen content in an iPhone frame with a colored accent border.
+
+    *shell* may be a cached build_phone_shell() image; it is copied, not modified.
+    *screen_content* should already be screen-sized (see scale_to_cover); its
+    alpha channel is replaced by the shared rounded-corner mask in place.
+    """
+    if shell is None:
+        phone = build_phone_shell(phone_w, phone_h, border_color)
+    else:
+        phone = shell.copy()
+
+    screen_w = phone_w - 2 * bezel
+    screen_h = phone_h - 2 * bezel
+    if screen_content.size != (screen_w, screen_h) or screen_content.mode != "RGBA":
+        screen_content = screen_content.convert("RGBA").resize((screen_w, screen_h), Image.LANCZOS)
+    place_screen(phone, screen_content, phone_w, phone_h, bezel)
+    return phone
+
+
+def place_screen(target, screen_content, phone_w, phone_h, bezel, origin=(0, 0)):
+    """Paste screen-sized content and the dynamic island onto a phone shell, in place.
+
+    *origin* is where the shell's top-left sits in *target*, so the screen
+    can also go straight onto a card that already has the shell drawn on it.
+    An RGBA *screen_content* has its alpha replaced by the rounded-corner mask.
+    """
+    screen_w = phone_w - 2 * bezel
+    screen_h = phone_h - 2 * bezel
+    body_r = int(phone_w * PHONE_BODY_RADIUS_PCT)
+    screen_r = int(body_r * 0.85)
+    border_w = max(int(phone_w * PHONE_BORDER_PCT), px(3))
 
     # Screen content
-    scaled = screen_content.resize((screen_w, screen_h), Image.LANCZOS)
-    rounded = round_corners(scaled, screen_r)
-    sx = border_w + bezel
-    sy = border_w + bezel
-    phone.paste(rounded, (sx, sy), rounded)
+    mask = corner_mask(screen_w, screen_h, screen_r)
+    if screen_content.mode == "RGBA":
+        screen_content.putalpha(mask)
+    sx = origin[0] + border_w + bezel
+    sy = origin[1] + border_w + bezel
+    target.paste(screen_content, (sx, sy), mask)
 
     # Dynamic island
     island_w = int(screen_w * PHONE_ISLAND_W_PCT)
     island_h = int(screen_h * PHONE_ISLAND_H_PCT)
     ix = sx + (screen_w - island_w) // 2
     iy = sy + int(screen_h * 0.012)
-    draw = ImageDraw.Draw(phone)
+    draw = ImageDraw.Draw(target)
     draw.rounded_rectangle(
         [(ix, iy), (ix + island_w, iy + island_h)],
         radius=island_h // 2,
         fill=(0, 0, 0, 255),
     )
 
-    return phone
-
 
 # ─────────────────────────────────────────────
 # CARD GENERATOR
 # ─────────────────────────────────────────────
 
-def make_card(frame, cw, ch, clip, lang, clip_idx):
-    """Generate a complete App Store screenshot card."""
-    c1, c2 = BG_GRADIENTS[clip]
-    tagline, subtitle = COPY[lang][clip_idx]
+LAYER_CACHE_SIZE = len(CLIPS)  # base-layer sets kept per process: one device's clips
+_LAYER_CACHE = OrderedDict()  # (cw, ch, clip, gradient) -> (frame, layers)
 
-    # 1. Gradient background
-    canvas = gradient_bg(cw, ch, c1, c2).convert("RGBA")
 
-    # 2. Headline with dark label blocks — BIG, positioned near the top
-    tag_size = int(ch * 0.050)
-    tag_font = get_font(lang, tag_size)
+def phone_geometry(cw, ch):
+    """Return (phone_w, phone_h, bezel) for a card size."""
+    # Phone dimensions — wide, bleeds off bottom by ~25%
+    #   Width: 85% of card (capped at 45% of card height for iPad)
+    phone_w = int(min(cw * 0.88, ch * 0.45))
+    phone_h = int(phone_w * PHONE_ASPECT)
+    bezel = max(int(phone_w * PHONE_BEZEL_PCT), px(4))
+    return phone_w, phone_h, bezel
+
+
+def shadow_params(cw):
+    """Return (offset, blur) of the phone drop shadow for a card width."""
+    return max(int(cw * 0.004), px(3)), max(int(cw * 0.012), px(10))
+
+
+def card_base_layers(frame, cw, ch, clip, gradient=None):
+    """Return the language-independent layers of a card, cached per process.
 
+    The gradient background, the cover-scaled and shaded video frame, the
+    phone shell and its blurred drop shadow depend only on the card size
+    and clip, so they are shared by every language. Callers must copy
+    before drawing on them. *gradient* replaces the clip's BG_GRADIENTS
+    entry.
+    """
+    gradient = gradient or BG_GRADIENTS[clip]
+    key = (cw, ch, clip, gradient)
+    cached = _LAYER_CACHE.get(key)
+    if cached is not None and cached[0] is frame:
+        _LAYER_CACHE.move_to_end(key)
+        return cached[1]
+
+    c1, c2 = gradient
+    phone_w, phone_h, bezel = phone_geometry(cw, ch)
+    screen_w = phone_w - 2 * bezel
+    screen_h = phone_h - 2 * bezel
+    _, shadow_blur_sz = shadow_params(cw)
+
+    shell = build_phone_shell(phone_w, phone_h, c1)
+    layers = {
+        "background": gradient_bg(cw, ch, c1, c2, mode="RGBA"),
+        "screen": add_teleprompter_shade(scale_to_cover(frame, screen_w, screen_h)),
+        "phone_shell": shell,
+        "border_color": c1,
+        # The screen never changes the phone's alpha, so its shadow is shared
+        "phone_shadow": shadow_pieces(shell, *shadow_params(cw)),
+    }
+
+    _LAYER_CACHE[key] = (frame, layers)
+    while len(_LAYER_CACHE) > LAYER_CACHE_SIZE:
+        _LAYER_CACHE.popitem(last=False)
+    return layers
+
+
+def card_backdrop(background, cw, ch, lang, clip_idx, copy=None):
+    """Draw the headline and subtitle on a copy of the gradient *background*.
+
+    *copy* is a (tagline, subtitle) pair replacing COPY[lang][clip_idx].
+    Returns (canvas, content_bottom), where content_bottom is the top of
+    the phone.
+    """
+    tagline, subtitle = copy or COPY[lang][clip_idx]
+
+    # 1. Gradient background
+    canvas = background.copy()
+
+    # 2. Headline with dark label blocks — BIG, positioned near the top,
+    #    each line's block auto-fit to 94% of the card width
     label_pad_x = int(cw * 0.030)
     label_pad_y = int(ch * 0.008)
     label_radius = int(ch * 0.008)
     label_gap = int(ch * 0.005)
 
+    tag_size = fit_font_size(lang, tagline.split("\n"),
+                             int(cw * 0.94) - 2 * label_pad_x, int(ch * 0.050))
+    tag_font = get_font(lang, tag_size)
+
     tag_start_y = int(ch * 0.040)
     canvas, tag_bottom_y = draw_label_text(
         canvas, cw // 2, tag_start_y, tagline, tag_font,
@@ -827,21 +1419,14 @@ def make_card(frame, cw, ch, clip, lang, clip_idx):
     )
 
     # 3. Subtitle — 2x size, auto-fit to card width
-    sub_size = int(ch * 0.032)
+    sub_size = fit_font_size(lang, subtitle.split("\n"), int(cw * 0.90), int(ch * 0.032))
     sub_font = get_font(lang, sub_size)
-    max_sub_w = int(cw * 0.90)
-    _tmp_d = ImageDraw.Draw(canvas)
-    _sub_bb = _tmp_d.textbbox((0, 0), subtitle, font=sub_font)
-    _sub_tw = _sub_bb[2] - _sub_bb[0]
-    if _sub_tw > max_sub_w:
-        sub_size = int(sub_size * max_sub_w / _sub_tw)
-        sub_font = get_font(lang, sub_size)
     sub_y = tag_bottom_y + int(ch * 0.005)
 
     canvas = draw_text_with_shadow(
         canvas, (cw // 2, sub_y), subtitle, sub_font,
         fill=(255, 255, 255, 220),
-        shadow_offset=(0, 3), shadow_blur=6,
+        shadow_offset=(0, px(3)), shadow_blur=px(6),
         anchor="ma", align="center",
     )
 
@@ -849,41 +1434,346 @@ def make_card(frame, cw, ch, clip, lang, clip_idx):
     _d = ImageDraw.Draw(canvas)
     sub_bb = _d.textbbox((cw // 2, sub_y), subtitle, font=sub_font, anchor="ma")
     content_bottom = sub_bb[3] + int(ch * 0.018)
+    return canvas, content_bottom
 
-    # 4. Phone dimensions — wide, bleeds off bottom by ~25%
-    #    Width: 85% of card (capped at 45% of card height for iPad)
-    phone_w = int(min(cw * 0.88, ch * 0.45))
-    phone_h = int(phone_w * PHONE_ASPECT)
 
-    bezel = max(int(phone_w * PHONE_BEZEL_PCT), 4)
-    screen_w = phone_w - 2 * bezel
-    screen_h = phone_h - 2 * bezel
+def card_phone(base, cw, ch, clip, lang):
+    """Build a card's phone mockup; it depends on the clip and language, not the copy."""
+    # 4. Phone dimensions
+    phone_w, phone_h, bezel = phone_geometry(cw, ch)
 
-    # 5. Screen content (video + teleprompter)
-    screen = create_screen_content(frame, screen_w, screen_h, lang, clip)
+    # 5. Screen content (shaded video + teleprompter text)
+    screen = draw_teleprompter_text(base["screen"].copy(), lang, clip)
 
     # 6. Phone mockup with colored border
-    border_color = c1
-    phone = build_phone_mockup(screen, phone_w, phone_h, bezel, border_color)
+    return build_phone_mockup(screen, phone_w, phone_h, bezel, base["border_color"],
+                              shell=base["phone_shell"])
+
 
+def place_phone(canvas, content_bottom, phone, base, cw):
+    """Composite *phone* and its shadow below the copy; returns the RGB card."""
     # 7. Position phone — centred, gap below subtitle, bottom bleeds off card
     phone_x = (cw - phone.width) // 2
     phone_y = content_bottom
 
-    shadow_off = max(int(cw * 0.004), 3)
-    shadow_blur_sz = max(int(cw * 0.012), 10)
-    canvas = composite_with_shadow(canvas, phone, (phone_x, phone_y),
-                                   offset=shadow_off, blur=shadow_blur_sz,
-                                   opacity=50)
-
+    # Only the parts of the shadow the phone won't cover are composited
+    for layer, (dx, dy) in base["phone_shadow"]:
+        composite_region(canvas, layer, (phone_x + dx, phone_y + dy))
+    canvas.paste(phone, (phone_x, phone_y), phone)
     return canvas.convert("RGB")
 
 
+def shadow_pieces(shell, offset, blur):
+    """Split the phone's drop shadow into the parts the phone doesn't cover.
+
+    Returns [(shadow layer, (dx, dy))], positioned relative to the shell's
+    top-left. Inside the rows where the shell is opaque edge to edge, the
+    shadow is painted over by the phone, so only the bands above and below
+    and the strips either side of those rows are kept.
+    """
+    shadow = make_shadow(shell, blur=blur, opacity=50)
+    opaque = np.flatnonzero(np.asarray(shell.getchannel("A")).min(axis=1) == 255)
+    origin = offset - blur * 3  # shadow top-left relative to the shell
+    if not len(opaque):
+        return [(shadow, (origin, origin))]
+
+    x0, x1 = -origin, -origin + shell.width  # the shell, in shadow coordinates
+    y0, y1 = -origin + opaque[0], -origin + opaque[-1] + 1
+    boxes = [(0, 0, shadow.width, y0), (0, y1, shadow.width, shadow.height),
+             (0, y0, x0, y1), (x1, y0, shadow.width, y1)]
+    return [(shadow.crop(box), (origin + box[0], origin + box[1]))
+            for box in boxes if box[2] > box[0] and box[3] > box[1]]
+
+
+def make_card(frame, cw, ch, clip, lang, clip_idx):
+    """Generate a complete App Store screenshot card."""
+    base = card_base_layers(frame, cw, ch, clip)
+    canvas, content_bottom = card_backdrop(base["background"], cw, ch, lang, clip_idx)
+    phone = card_phone(base, cw, ch, clip, lang)
+    return place_phone(canvas, content_bottom, phone, base, cw)
+
+
+# ─────────────────────────────────────────────
+# RENDER WORKERS
+# ─────────────────────────────────────────────
+_FRAMES = {}  # clip -> extracted PIL frame (set once per process)
+_MONTAGE_TILES = False  # also return a reduced copy of each card
+_PNG_PROFILE = "draft"  # png_output profile applied to each card after the fast write
+
+
+def _init_worker(latin_font, latin_font_index, cjk_fonts, frames, draft_scale=1.0,
+                 montage_tiles=False, png_profile="draft"):
+    """Install the parent's detected fonts and extracted frames in a worker.
+
+    Runs once per worker process, so fonts are never re-probed and frames
+    never re-extracted per card.
+    """
+    global LATIN_FONT, LATIN_FONT_INDEX, DRAFT_SCALE, _MONTAGE_TILES, _PNG_PROFILE
+    LATIN_FONT = latin_font
+    LATIN_FONT_INDEX = latin_font_index
+    DRAFT_SCALE = draft_scale
+    _MONTAGE_TILES = montage_tiles
+    _PNG_PROFILE = png_profile
+    _LANG_CJK_FONTS.clear()
+    _LANG_CJK_FONTS.update(cjk_fonts)
+    _FRAMES.clear()
+    _FRAMES.update(frames)
+
+
+def render_card(job):
+    """Render and save a single (device, lang, clip) card, then run the
+    PNG profile's post passes on it in the same process.
+
+    Returns (path, montage tile), where the tile is None unless montage
+    tiles were requested.
+    """
+    out_path, (w, h), lang, clip_idx, clip_name = job
+    card = make_card(_FRAMES[clip_name], w, h, clip_name, lang, clip_idx)
+    tile = montage.reduce_card(card) if _MONTAGE_TILES else None
+    png_output.save_fast(card, out_path)
+    # Recompressing here, not in a second pool, keeps the process count at
+    # --jobs; the other workers go on rendering meanwhile
+    png_output.optimize_png(out_path, _PNG_PROFILE)
+    return out_path, tile
+
+
+def card_jobs(frames, sizes, out_root=None):
+    """List every (out_path, size, lang, clip_idx, clip) card to render.
+
+    Cards are ordered by device, then language, then clip, so each row of
+    a device's montage is complete as early as possible. A device's base
+    layers for all clips stay in the card_base_layers() cache while its
+    languages render (LAYER_CACHE_SIZE >= len(CLIPS)).
+    """
+    jobs = []
+    for device, (w, h) in sizes:
+        for lang in LANGUAGES:
+            for clip_idx, clip_name in enumerate(CLIPS):
+                if clip_name not in frames:
+                    continue
+                out_dir = os.path.join(out_root or OUTPUT_DIR, device, lang)
+                fname = f"{clip_name}_{w}x{h}.png"
+                jobs.append((os.path.join(out_dir, fname), (w, h),
+                             lang, clip_idx, clip_name))
+    return jobs
+
+
+def render_all(jobs, frames, n_jobs, montage_tiles=False, png_profile="draft"):
+    """Yield (output path, montage tile) as cards finish, serially or in a process pool."""
+    worker_args = (LATIN_FONT, LATIN_FONT_INDEX, dict(_LANG_CJK_FONTS), frames,
+                   DRAFT_SCALE, montage_tiles, png_profile)
+    if n_jobs <= 1:
+        _init_worker(*worker_args)
+        for job in jobs:
+            yield render_card(job)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=worker_args,
+    ) as pool:
+        futures = [pool.submit(render_card, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# ─────────────────────────────────────────────
+# MONTAGES & DRAFT CONTACT SHEET
+# ─────────────────────────────────────────────
+
+def start_montages(sizes, frames):
+    """Open a streaming lang x clip montage per device in MONTAGE_DIR."""
+    os.makedirs(MONTAGE_DIR, exist_ok=True)
+    clips = [c for c in CLIPS if c in frames]
+    font = get_font("en-US", MONTAGE_LABEL_SIZE)
+    return {
+        device: montage.Montage(
+            os.path.join(MONTAGE_DIR, f"{device}_montage.png"),
+            LANGUAGES, clips, montage.tile_size(size), font, title=device)
+        for device, size in sizes
+    }
+
+
+def start_contact_sheet(sizes, frames):
+    """Open the draft contact sheet: one row per device and language, one
+    column per clip, with whole draft cards centred in equal cells."""
+    os.makedirs(os.path.dirname(CONTACT_SHEET), exist_ok=True)
+    rows = [f"{device} {lang}" for device, _ in sizes for lang in LANGUAGES]
+    clips = [c for c in CLIPS if c in frames]
+    cell = (max(w for _, (w, _) in sizes), max(h for _, (_, h) in sizes))
+    return montage.Montage(CONTACT_SHEET, rows, clips, cell,
+                           get_font("en-US", MONTAGE_LABEL_SIZE), title="Drafts")
+
+
+def save_tile(tile, key):
+    """Keep a card's montage tile in MONTAGE_TILE_DIR under its cache key."""
+    os.makedirs(MONTAGE_TILE_DIR, exist_ok=True)
+    path = os.path.join(MONTAGE_TILE_DIR, f"{key}.png")
+    png_output.save_fast(tile, path + ".tmp.png")
+    os.replace(path + ".tmp.png", path)
+
+
+def cached_tile(card_path, key):
+    """Montage tile of a card the render cache skipped.
+
+    Read from MONTAGE_TILE_DIR when present, so unchanged cards are never
+    decoded at full size; otherwise reduced from the card and kept.
+    """
+    path = os.path.join(MONTAGE_TILE_DIR, f"{key}.png")
+    if os.path.exists(path):
+        with Image.open(path) as tile:
+            return tile.convert("RGB")
+    with Image.open(card_path) as card:
+        tile = montage.reduce_card(card.convert("RGB"))
+    save_tile(tile, key)
+    return tile
+
+
+def prune_tiles(keys):
+    """Delete kept tiles of cards that no longer exist or have changed."""
+    if not os.path.isdir(MONTAGE_TILE_DIR):
+        return
+    for name in os.listdir(MONTAGE_TILE_DIR):
+        if name[:-len(".png")] not in keys:
+            os.remove(os.path.join(MONTAGE_TILE_DIR, name))
+
+
+def add_montage_tile(montages, cell, tile):
+    device, lang, clip = cell
+    montages[device].add(lang, clip, tile)
+
+
+def render_drafts(frames, sizes, scale, n_jobs):
+    """Render every card at *scale* into DRAFT_DIR and tile a contact sheet.
+
+    Drafts bypass the render cache and never touch OUTPUT_DIR.
+    """
+    global DRAFT_SCALE
+    DRAFT_SCALE = scale
+    draft_sizes = [(device, (max(1, round(w * scale)), max(1, round(h * scale))))
+                   for device, (w, h) in sizes]
+    jobs = card_jobs(frames, draft_sizes, DRAFT_DIR)
+    for job in jobs:
+        os.makedirs(os.path.dirname(job[0]), exist_ok=True)
+
+    by_size = {size: device for device, size in draft_sizes}
+    cells = {out_path: (f"{by_size[size]} {lang}", clip)
+             for out_path, size, lang, _, clip in jobs}
+    sheet = start_contact_sheet(draft_sizes, frames)
+
+    print(f"\n[2/3] Generating {len(jobs)} draft images at {scale:.0%}...")
+    try:
+        for count, (out_path, _) in enumerate(render_all(jobs, frames, min(n_jobs, len(jobs))), 1):
+            with Image.open(out_path) as card:
+                sheet.add(*cells[out_path], card.convert("RGB"))
+            if count % 8 == 0 or count == len(jobs):
+                print(f"  Progress: {count}/{len(jobs)}")
+
+        sheet.close()
+        print(f"\n[3/3] Done! Contact sheet: {CONTACT_SHEET}")
+    finally:
+        sheet.discard()
+
+
+# ─────────────────────────────────────────────
+# RENDER CACHE
+# ─────────────────────────────────────────────
+
+def _script_version():
+    """Hash of the rendering sources; any code change invalidates the cache."""
+    h = hashlib.sha256()
+    for module_file in [__file__, backgrounds.__file__, png_output.__file__]:
+        with open(os.path.abspath(module_file), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def frame_digest(frame):
+    """Hash of an extracted frame's pixels."""
+    h = hashlib.sha256(f"{frame.mode}{frame.size}".encode())
+    h.update(frame.tobytes())
+    return h.hexdigest()
+
+
+def card_cache_key(job, frame_digests, script_version,
+                   profile=png_output.DEFAULT_PROFILE):
+    """Hash everything that affects the pixels (and PNG encoding) of one card."""
+    _, size, lang, clip_idx, clip_name = job
+    inputs = {
+        "script": script_version,
+        "profile": profile,
+        "frame": frame_digests[clip_name],
+        "size": size,
+        "copy": COPY[lang][clip_idx],
+        "prompter": PROMPTER_TEXT[clip_name][lang],
+        "gradient": BG_GRADIENTS[clip_name],
+        "font": _LANG_CJK_FONTS.get(lang, (LATIN_FONT, LATIN_FONT_INDEX)),
+        "design": [
+            PHONE_ASPECT, PHONE_BODY_COLOR, PHONE_BODY_RADIUS_PCT,
+            PHONE_BEZEL_PCT, PHONE_ISLAND_W_PCT, PHONE_ISLAND_H_PCT,
+            PHONE_BORDER_PCT, LABEL_BLOCK_COLOR, TEXT_COLOR, TEXT_SHADOW,
+        ],
+    }
+    blob = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path=CACHE_MANIFEST):
+    """Load the {relative output path: cache key} manifest, or {} if absent."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=CACHE_MANIFEST):
+    """Atomically write the render cache manifest."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
 # ─────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DemoScope App Store asset generator")
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1,
+        help="number of worker processes (default: CPU count, 1 = serial)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-render all cards, ignoring the render cache",
+    )
+    parser.add_argument(
+        "--profile", choices=sorted(png_output.PROFILES),
+        default=png_output.DEFAULT_PROFILE,
+        help="PNG output profile (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--draft-scale", type=float, metavar="S",
+        help="render drafts at this fraction of full size (e.g. 0.25) into "
+             "AppStoreDrafts/ with a contact sheet, skipping the render cache",
+    )
+    parser.add_argument(
+        "--no-montage", action="store_true",
+        help="skip the per-device review montages in AppStoreReview/",
+    )
+    args = parser.parse_args(argv)
+    if args.draft_scale is not None and not 0 < args.draft_scale <= 1:
+        parser.error("--draft-scale must be in (0, 1]")
+    return args
+
+
 def main():
+    args = parse_args()
+
     print("DemoScope App Store Asset Generator")
     print("=" * 50)
 
@@ -906,29 +1796,70 @@ def main():
 
     # Generate assets
     sizes = [("iPhone", IPHONE_SIZE), ("iPad", IPAD_SIZE)]
-    total = len(frames) * len(LANGUAGES) * len(sizes)
-    count = 0
-
-    print(f"\n[2/3] Generating {total} images...")
-
-    for device, (w, h) in sizes:
-        for lang in LANGUAGES:
-            out_dir = os.path.join(OUTPUT_DIR, device, lang)
-            os.makedirs(out_dir, exist_ok=True)
-
-            for clip_idx, clip_name in enumerate(CLIPS):
-                if clip_name not in frames:
-                    continue
-
-                frame = frames[clip_name]
-                card = make_card(frame, w, h, clip_name, lang, clip_idx)
+    if args.draft_scale is not None:
+        render_drafts(frames, sizes, args.draft_scale, args.jobs)
+        return
+
+    jobs = card_jobs(frames, sizes)
+
+    # Skip cards whose inputs are unchanged since the last run
+    script_version = _script_version()
+    digests = {clip: frame_digest(frame) for clip, frame in frames.items()}
+    manifest = {} if args.force else load_manifest()
+    keys = {}
+    pending = []
+    for job in jobs:
+        rel = os.path.relpath(job[0], OUTPUT_DIR)
+        keys[job[0]] = card_cache_key(job, digests, script_version, args.profile)
+        if manifest.get(rel) == keys[job[0]] and os.path.exists(job[0]):
+            continue
+        pending.append(job)
 
-                fname = f"{clip_name}_{w}x{h}.png"
-                card.save(os.path.join(out_dir, fname), "PNG", optimize=True)
+    total = len(pending)
+    count = 0
 
-                count += 1
-                if count % 8 == 0 or count == total:
-                    print(f"  Progress: {count}/{total}")
+    print(f"\n[2/3] Generating {total} images...  (PNG profile: {args.profile})")
+    if len(jobs) > total:
+        print(f"  Cached: {len(jobs) - total} unchanged (use --force to re-render)")
+
+    for job in pending:
+        os.makedirs(os.path.dirname(job[0]), exist_ok=True)
+
+    # Review montages: cached cards are tiled from MONTAGE_TILE_DIR, rendered ones from memory
+    montages = {} if args.no_montage else start_montages(sizes, frames)
+    cells = {job[0]: (device, job[2], job[4])
+             for device, size in sizes for job in jobs if job[1] == size}
+
+    n_jobs = min(args.jobs, max(total, 1))
+    png_output.check_tools(args.profile)
+    try:
+        if montages:
+            pending_paths = {job[0] for job in pending}
+            for job in jobs:
+                if job[0] not in pending_paths:
+                    add_montage_tile(montages, cells[job[0]],
+                                     cached_tile(job[0], keys[job[0]]))
+
+        for out_path, tile in render_all(pending, frames, n_jobs, bool(montages), args.profile):
+            if tile is not None:
+                add_montage_tile(montages, cells[out_path], tile)
+                save_tile(tile, keys[out_path])
+            manifest[os.path.relpath(out_path, OUTPUT_DIR)] = keys[out_path]
+            count += 1
+            if count % 8 == 0 or count == total:
+                print(f"  Progress: {count}/{total}")
+
+        for sheet in montages.values():
+            print(f"  Montage: {sheet.close()}")
+        if montages:
+            prune_tiles(set(keys.values()))
+    finally:
+        save_manifest(manifest)
+        # Only reached unclosed if a render failed; leave no partial montages
+        for sheet in montages.values():
+            sheet.discard()
+
+    png_output.report_sizes([job[0] for job in jobs])
 
     # Summary
     print(f"\n[3/3] Done! Generated {count} images.")
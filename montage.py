@@ -0,0 +1,99 @@
+"""
+Review montages for the App Store asset generator
+=================================================
+Assembles one downsampled grid per device while the cards render, with a
+row per language and a column per clip. Workers hand back reduced copies
+of the cards they render, so the full-size PNGs are never read back.
+
+Each row is written to the PNG as soon as its last tile arrives (see
+png_output.PNGStreamWriter). Only unfinished rows are held in memory,
+however many locales there are.
+
+The --draft-scale contact sheet is the same grid, with a row per device
+and language and the whole draft cards as tiles.
+"""
+
+from PIL import Image, ImageDraw
+
+import png_output
+
+MONTAGE_REDUCE = 5  # tiles are cards reduced by this integer factor
+MONTAGE_GAP = 8
+MONTAGE_BG = (24, 24, 26)
+MONTAGE_LABEL = (255, 255, 255)
+
+
+class Montage:
+    """A row-major grid of tiles streamed to a PNG one row at a time."""
+
+    def __init__(self, path, rows, cols, tile_size, font, title=""):
+        self.rows = list(rows)
+        self.cols = list(cols)
+        self.tile_w, self.tile_h = tile_size
+        self.font = font
+        self._tiles = {}  # (row, col) -> tile, for rows not yet written
+        self._next_row = 0
+
+        gap = MONTAGE_GAP
+        measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+        self.label_w = 2 * gap + max(int(measure.textlength(r, font=font)) for r in self.rows)
+        self.header_h = 2 * gap + font.size
+        self.width = self.label_w + len(self.cols) * (self.tile_w + gap)
+        height = self.header_h + len(self.rows) * (self.tile_h + gap)
+        self._writer = png_output.PNGStreamWriter(path, self.width, height)
+
+        header = self._band(self.header_h)
+        draw = ImageDraw.Draw(header)
+        draw.text((gap, self.header_h // 2), title, font=font, fill=MONTAGE_LABEL, anchor="lm")
+        for i, col in enumerate(self.cols):
+            x = self.label_w + i * (self.tile_w + gap) + self.tile_w // 2
+            draw.text((x, self.header_h // 2), col, font=font, fill=MONTAGE_LABEL, anchor="mm")
+        self._writer.write(header)
+
+    def _band(self, height):
+        return Image.new("RGB", (self.width, height), MONTAGE_BG)
+
+    def add(self, row, col, tile):
+        """Place *tile* at (row, col) and flush any rows now complete."""
+        self._tiles[(row, col)] = tile
+        while self._next_row < len(self.rows) and all(
+                (self.rows[self._next_row], c) in self._tiles for c in self.cols):
+            self._write_row()
+
+    def _write_row(self):
+        row = self.rows[self._next_row]
+        band = self._band(self.tile_h + MONTAGE_GAP)
+        ImageDraw.Draw(band).text((MONTAGE_GAP, self.tile_h // 2), row, font=self.font,
+                                  fill=MONTAGE_LABEL, anchor="lm")
+        for i, col in enumerate(self.cols):
+            tile = self._tiles.pop((row, col), None)
+            if tile is not None:
+                # Tiles smaller than the cell (e.g. iPhone in an iPad-wide
+                # contact sheet) are centred in it
+                x = self.label_w + i * (self.tile_w + MONTAGE_GAP) + (self.tile_w - tile.width) // 2
+                band.paste(tile, (x, (self.tile_h - tile.height) // 2))
+        self._writer.write(band)
+        self._next_row += 1
+
+    def close(self):
+        """Write any remaining rows (missing tiles stay blank) and finish the file."""
+        while self._next_row < len(self.rows):
+            self._write_row()
+        self._writer.close()
+        return self._writer.path
+
+    def discard(self):
+        """Abandon the montage, leaving no partial file; no-op after close()."""
+        self._tiles.clear()
+        self._writer.discard()
+
+
+def reduce_card(card):
+    """Downsample a rendered card to its montage tile."""
+    return card.reduce(MONTAGE_REDUCE)
+
+
+def tile_size(card_size):
+    """Size of the tile reduce_card() makes from a card of *card_size*."""
+    w, h = card_size
+    return -(-w // MONTAGE_REDUCE), -(-h // MONTAGE_REDUCE)
@@ -0,0 +1,152 @@
+"""
+PNG output stage for the App Store asset generator
+===================================================
+Cards are first written with fast zlib compression. A profile then decides
+what happens next:
+
+    draft    keep the fast PNGs (quick layout iteration)
+    release  re-encode with PIL's maximum zlib effort (optimize=True)
+    max      release, then an oxipng pass (with zopfli) when installed
+
+Post passes run in the render worker right after each card is written, so
+one worker recompresses while the others go on rendering, without any
+processes beyond --jobs. They rewrite each file atomically under the same
+name.
+
+The release pass is not free. optimize=True costs about 2x a card's render
+and fast write on flat synthetic frames, and up to about 7x on real video
+frames. With --jobs 1 nothing runs alongside it, so a serial release run
+takes several times as long as a draft one. Use draft while iterating and
+give release runs as many --jobs as there are cores.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import zlib
+
+from PIL import Image
+
+RENDER_COMPRESS_LEVEL = 1  # zlib level for the first, fast write
+
+PROFILES = {
+    "draft": [],
+    "release": ["pil"],
+    "max": ["pil", "oxipng"],
+}
+DEFAULT_PROFILE = "release"
+
+# Per-screenshot size budget; larger files are flagged in the report
+MAX_FILE_BYTES = 10 * 1024 * 1024
+
+
+def save_fast(img, path):
+    """Write *img* as a quickly-compressed PNG."""
+    img.save(path, "PNG", compress_level=RENDER_COMPRESS_LEVEL)
+
+
+def _pil_optimize(path):
+    with Image.open(path) as im:
+        im.load()
+        tmp = path + ".tmp.png"
+        im.save(tmp, "PNG", optimize=True)
+    os.replace(tmp, path)
+
+
+def _oxipng(path):
+    exe = shutil.which("oxipng")
+    if exe is None:
+        return
+    cmd = [exe, "-q", "-o", "max", "-Z", "--strip", "safe", path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"oxipng failed for {path}: {result.stderr[-500:]}")
+
+
+_PASSES = {"pil": _pil_optimize, "oxipng": _oxipng}
+
+
+def optimize_png(path, profile):
+    """Run the profile's post passes on *path*; returns (path, size in bytes)."""
+    for name in PROFILES[profile]:
+        _PASSES[name](path)
+    return path, os.path.getsize(path)
+
+
+def check_tools(profile):
+    """Warn if a post pass the profile asks for has no tool installed."""
+    if "oxipng" in PROFILES[profile] and shutil.which("oxipng") is None:
+        print("  WARNING: oxipng not found on PATH; using PIL optimize only.")
+
+
+def format_size(n_bytes):
+    return f"{n_bytes / (1024 * 1024):.1f} MB"
+
+
+def report_sizes(paths, limit=MAX_FILE_BYTES):
+    """Print total / largest file size and flag any file over *limit*."""
+    sizes = {p: os.path.getsize(p) for p in paths if os.path.exists(p)}
+    if not sizes:
+        return
+    largest = max(sizes, key=sizes.get)
+    print(f"  PNG sizes: {format_size(sum(sizes.values()))} total, "
+          f"largest {format_size(sizes[largest])} ({os.path.basename(largest)})")
+    for path, size in sorted(sizes.items()):
+        if size > limit:
+            print(f"  ⚠  {path}: {format_size(size)} exceeds {format_size(limit)} limit")
+
+
+class PNGStreamWriter:
+    """Write an RGB PNG one band of rows at a time.
+
+    Only the current band is ever in memory, so very tall images (such as
+    a montage with dozens of locales) can be written with bounded memory.
+    The file is written under a temporary name and renamed on close(), or
+    removed by discard() if the image is abandoned part way.
+    """
+
+    def __init__(self, path, width, height, compress_level=RENDER_COMPRESS_LEVEL):
+        self.path = path
+        self.width = width
+        self.rows_left = height
+        self._tmp = path + ".tmp.png"
+        self._file = open(self._tmp, "wb")
+        self._zlib = zlib.compressobj(compress_level)
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8-bit truecolour, no interlacing
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, band):
+        """Append the rows of *band*, an RGB image exactly self.width wide."""
+        if band.mode != "RGB" or band.width != self.width:
+            raise ValueError(f"expected an RGB band {self.width} px wide")
+        if band.height > self.rows_left:
+            raise ValueError("band extends past the declared image height")
+        raw = band.tobytes()
+        stride = self.width * 3
+        # Filter type 0 (none) before every scanline
+        rows = b"".join(b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride))
+        data = self._zlib.compress(rows)
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_left -= band.height
+
+    def close(self):
+        if self.rows_left:
+            self.discard()
+            raise ValueError(f"{self.rows_left} rows of {self.path} were never written")
+        self._chunk(b"IDAT", self._zlib.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def discard(self):
+        """Abandon an unfinished file and remove its temporary; no-op after close()."""
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self._tmp)
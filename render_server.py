@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+DemoScope Card Render Server
+============================
+A long-lived local HTTP server for previewing cards while the copy is
+being edited. Fonts are detected and frames extracted once at startup.
+The base layers (gradient, shaded screen, phone shell and shadow) and the
+finished phone mockups (screen plus teleprompter text) stay cached
+between requests, so a copy edit only draws the headline and subtitle and
+places the phone.
+
+Usage:
+    python3 render_server.py [--port 8765] [--cache-size 128]
+
+Endpoints:
+    GET /card/{device}/{lang}/{clip}   render one card
+    GET /status                        clips, languages, devices, cache stats
+
+/card query parameters (all optional):
+    tagline, subtitle   replacement copy (use %0A for a line break)
+    top, bottom         gradient colours as hex, e.g. ff6b6b (top also
+                        colours the phone border)
+    scale               render at a fraction of full size, 0.1-1 (default 1),
+                        rounded to a multiple of SCALE_STEP
+    format              jpeg (default, fastest to encode) or png
+
+Rendered results are kept in a bounded in-memory LRU, so asking for the
+same card again is answered without rendering. Responses carry
+X-Cache (hit/miss) and X-Render-Ms headers. The server binds to
+127.0.0.1 and needs no network access. Restart it to pick up new videos.
+
+Typical response times (X-Render-Ms, one core):
+    cache hit                                   ~1 ms
+    copy edit, en-US or a language already seen 45-90 ms
+    first card in a new language or scale       85-160 ms
+    first card in a new gradient colour         240-390 ms
+Only copy edits stay under 100 ms. A new language, scale or colour has to
+rebuild the phone mockup or the base layers first. After that, edits with
+the same settings are as fast as any other.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import generate_appstore_assets as gaa
+import png_output
+
+SIZES = {"iPhone": gaa.IPHONE_SIZE, "iPad": gaa.IPAD_SIZE}
+RESULT_CACHE_SIZE = 128  # rendered cards kept in memory
+PHONE_CACHE_SIZE = 16  # phone mockups kept in memory (10-13 MB each at full size)
+WARM_LANG = "en-US"  # phones prebuilt at startup
+SCALE_STEP = 0.05  # ?scale= is rounded to this, so the caches see few distinct sizes
+JPEG_QUALITY = 90
+FORMATS = {"jpeg": "image/jpeg", "png": "image/png"}
+
+_FRAMES = {}  # clip -> extracted frame, loaded at startup
+_RESULTS = OrderedDict()  # request key -> encoded image bytes
+_RESULTS_LOCK = threading.Lock()
+_PHONES = OrderedDict()  # (size, clip, lang, border colour, scale) -> phone mockup
+# The layer caches and DRAFT_SCALE are module state, so renders are serialised
+_RENDER_LOCK = threading.Lock()
+STATS = {"hits": 0, "misses": 0}
+
+
+# ─────────────────────────────────────────────
+# RENDERING
+# ─────────────────────────────────────────────
+
+def parse_color(value):
+    """Parse 'rrggbb' or '#rrggbb' into an (r, g, b) tuple."""
+    value = value.lstrip("#")
+    if len(value) != 6:
+        raise ValueError(f"expected a 6-digit hex colour, got {value!r}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def card_request(device, lang, clip, query):
+    """Validate a /card request; returns the normalised render parameters."""
+    if device not in SIZES:
+        raise LookupError(f"unknown device {device!r}; choose from {sorted(SIZES)}")
+    if lang not in gaa.COPY:
+        raise LookupError(f"unknown language {lang!r}")
+    if clip not in _FRAMES:
+        raise LookupError(f"unknown clip {clip!r}; loaded: {sorted(_FRAMES)}")
+
+    def arg(name, default=None):
+        return query.get(name, [default])[0]
+
+    clip_idx = gaa.CLIPS.index(clip)
+    tagline, subtitle = gaa.COPY[lang][clip_idx]
+    top, bottom = gaa.BG_GRADIENTS[clip]
+    scale = float(arg("scale", 1))
+    if not 0.1 <= scale <= 1:
+        raise ValueError("scale must be between 0.1 and 1")
+    scale = round(round(scale / SCALE_STEP) * SCALE_STEP, 2)
+    fmt = arg("format", "jpeg").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {sorted(FORMATS)}")
+
+    w, h = SIZES[device]
+    return {
+        "size": (max(1, round(w * scale)), max(1, round(h * scale))),
+        "scale": scale,
+        "lang": lang,
+        "clip": clip,
+        "copy": (arg("tagline", tagline), arg("subtitle", subtitle)),
+        "gradient": (parse_color(arg("top")) if arg("top") else top,
+                     parse_color(arg("bottom")) if arg("bottom") else bottom),
+        "format": fmt,
+    }
+
+
+def cached_phone(base, params):
+    """The card's phone mockup, kept between requests that only change the copy.
+
+    Call under _RENDER_LOCK, with DRAFT_SCALE set for the request.
+    """
+    cw, ch = params["size"]
+    key = (cw, ch, params["clip"], params["lang"], params["gradient"][0], params["scale"])
+    phone = _PHONES.get(key)
+    if phone is not None:
+        _PHONES.move_to_end(key)
+        return phone
+    phone = gaa.card_phone(base, cw, ch, params["clip"], params["lang"])
+    return gaa.lru_put(_PHONES, key, phone, PHONE_CACHE_SIZE)
+
+
+@contextlib.contextmanager
+def draft_scale(scale):
+    """Set gaa.DRAFT_SCALE for one render, as --draft-scale does.
+
+    px() sizes (shadows, minimum widths) then shrink with the card.
+    """
+    saved, gaa.DRAFT_SCALE = gaa.DRAFT_SCALE, scale
+    try:
+        yield
+    finally:
+        gaa.DRAFT_SCALE = saved
+
+
+def render(params):
+    """Render and encode one card; returns the image bytes.
+
+    Same pixels as make_card(), but the phone mockup (screen, teleprompter
+    text and shell) comes from cached_phone(), so editing the copy only
+    redraws the text and the phone placement.
+    """
+    clip, lang = params["clip"], params["lang"]
+    cw, ch = params["size"]
+    with _RENDER_LOCK, draft_scale(params["scale"]):
+        base = gaa.card_base_layers(_FRAMES[clip], cw, ch, clip, params["gradient"])
+        phone = cached_phone(base, params)
+        canvas, content_bottom = gaa.card_backdrop(base["background"], cw, ch, lang, 0,
+                                                   params["copy"])
+        card = gaa.place_phone(canvas, content_bottom, phone, base, cw)
+
+    buf = io.BytesIO()
+    if params["format"] == "png":
+        png_output.save_fast(card, buf)
+    else:
+        card.save(buf, "JPEG", quality=JPEG_QUALITY)
+    return buf.getvalue()
+
+
+def cached_render(params):
+    """Return (image bytes, cache hit) using the bounded result LRU."""
+    key = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    with _RESULTS_LOCK:
+        data = _RESULTS.get(key)
+        if data is not None:
+            _RESULTS.move_to_end(key)
+            STATS["hits"] += 1
+            return data, True
+    data = render(params)
+    with _RESULTS_LOCK:
+        STATS["misses"] += 1
+        gaa.lru_put(_RESULTS, key, data, RESULT_CACHE_SIZE)
+    return data, False
+
+
+# ─────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────
+
+class CardHandler(BaseHTTPRequestHandler):
+    server_version = "DemoScopeRender/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+
+        if parts == ["status"]:
+            body = json.dumps({
+                "clips": sorted(_FRAMES),
+                "languages": gaa.LANGUAGES,
+                "devices": sorted(SIZES),
+                "cache": {**STATS, "entries": len(_RESULTS), "limit": RESULT_CACHE_SIZE},
+            }, indent=2).encode()
+            return self._send(200, "application/json", body)
+
+        if len(parts) != 4 or parts[0] != "card":
+            return self._error(404, "expected /card/{device}/{lang}/{clip} or /status")
+
+        start = time.perf_counter()
+        try:
+            params = card_request(*parts[1:], parse_qs(url.query))
+        except LookupError as e:
+            return self._error(404, e.args[0])
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        try:
+            data, hit = cached_render(params)
+        except Exception as e:
+            print(f"  ERROR rendering {url.path}: {e!r}")
+            return self._error(500, f"render failed: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._send(200, FORMATS[params["format"]], data, {
+            "X-Cache": "hit" if hit else "miss",
+            "X-Render-Ms": f"{elapsed_ms:.1f}",
+        })
+
+    def _error(self, status, message):
+        self._send(status, "text/plain; charset=utf-8", (message + "\n").encode())
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        print(f"  {self.address_string()} {fmt % args}")
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def warm_up():
+    """Detect fonts, extract every clip's frame and build its base layers."""
+    gaa.detect_fonts()
+    for clip in gaa.CLIPS:
+        path = os.path.join(gaa.PORTRAIT_DIR, f"{clip}.mp4")
+        if not os.path.exists(path):
+            print(f"  SKIP: {path} not found")
+            continue
+        ts = gaa.FRAME_TIMESTAMPS.get(clip, "0:00")
+        _FRAMES[clip] = gaa.extract_frame(path, ts)
+        print(f"  OK  {clip} @ {ts}: {_FRAMES[clip].size}")
+
+    # Keep every device x clip base-layer set (plus a few recolours) warm,
+    # and prebuild the WARM_LANG phones so the first edit is already fast
+    gaa.LAYER_CACHE_SIZE = max(gaa.LAYER_CACHE_SIZE, 2 * len(SIZES) * len(_FRAMES))
+    for device in SIZES:
+        for clip in _FRAMES:
+            params = card_request(device, WARM_LANG, clip, {})
+            with _RENDER_LOCK, draft_scale(params["scale"]):
+                base = gaa.card_base_layers(_FRAMES[clip], *params["size"], clip,
+                                            params["gradient"])
+                cached_phone(base, params)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DemoScope card render server")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="port on 127.0.0.1 (default: %(default)s)")
+    parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE,
+                        help="rendered cards kept in memory (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main():
+    global RESULT_CACHE_SIZE
+    args = parse_args()
+    RESULT_CACHE_SIZE = max(1, args.cache_size)
+
+    print("DemoScope Card Render Server")
+    print("=" * 50)
+    warm_up()
+    if not _FRAMES:
+        raise SystemExit("ERROR: No frames extracted. Check Portrait/ directory.")
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), CardHandler)
+    print(f"\nServing on http://127.0.0.1:{args.port}/card/iPhone/en-US/{next(iter(_FRAMES))}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
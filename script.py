@@ -3,17 +3,38 @@
 DemoScope In-App Event Video Generator
 Creates event_card.mp4 (landscape) and event_details.mp4 (portrait)
 No text overlay — clean clips, scaled and concatenated.
+
+ENGINE selects how each output is built:
+  "filtergraph" — one ffmpeg run: trim, scale/crop and concat in a single
+                  filter_complex, encoded once (frame-accurate cuts)
+  "clips"       — encode each clip to a temp mp4, then stream-copy concat
+
+With PARALLEL_OUTPUTS, both outputs are built concurrently and the CPU
+cores are split between them via ffmpeg's -threads option.
+
+Builds are incremental: an output whose clips, order and settings are
+unchanged is skipped, and the "clips" engine keeps each encoded clip in
+build_cache.BUILD_DIR, so reordering CLIP_ORDER only redoes the concat.
 """
 
-import subprocess
 import os
-import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import build_cache
+from ffmpeg_runner import run_ffmpeg, trace_span, write_trace
 
 # ─────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────
 CLIP_ORDER = ["woman_1", "man_1", "woman_2", "man_2"]
 CLIP_DURATION = 3  # seconds per clip
+FPS = 30
+X264_CRF = 18
+X264_PRESET = "fast"
+ENGINE = "filtergraph"  # "filtergraph" or "clips"
+PARALLEL_OUTPUTS = True  # build landscape and portrait at the same time
+TRACE_PATH = None  # e.g. "event_video_trace.json" — Chrome trace of every ffmpeg run
 
 INPUT_BASE = "."
 LANDSCAPE_DIR = os.path.join(INPUT_BASE, "Landscape")
@@ -24,12 +45,35 @@ OUTPUT_DETAILS = "event_details.mp4"
 LANDSCAPE_W, LANDSCAPE_H = 1920, 1080
 PORTRAIT_W, PORTRAIT_H = 1080, 1920
 
+# (source_dir, width, height, output_path)
+OUTPUTS = [
+    (LANDSCAPE_DIR, LANDSCAPE_W, LANDSCAPE_H, OUTPUT_CARD),
+    (PORTRAIT_DIR, PORTRAIT_W, PORTRAIT_H, OUTPUT_DETAILS),
+]
+
 
 # ─────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────
 
-def build_clip(input_path, output_path, target_w, target_h):
+def encode_settings():
+    """Settings that change every clip's encode."""
+    return [CLIP_DURATION, FPS, X264_CRF, X264_PRESET]
+
+
+def clip_target(digest, target_w, target_h):
+    """Build-directory path of one encoded clip (the "clips" engine)."""
+    key = build_cache.step_key("clip", digest, target_w, target_h, encode_settings())
+    return build_cache.target_path("event_clips", key, ".mp4")
+
+
+def output_key(digests, target_w, target_h):
+    """Key of an output built from clips with content *digests*, in order."""
+    return build_cache.step_key("event", ENGINE, digests, target_w, target_h,
+                                encode_settings())
+
+
+def build_clip(input_path, output_path, target_w, target_h, threads=None):
     scale_filter = (
         f"scale={target_w}:{target_h}:force_original_aspect_ratio=increase,"
         f"crop={target_w}:{target_h}"
@@ -42,15 +86,17 @@ def build_clip(input_path, output_path, target_w, target_h):
         "-vf", scale_filter,
         "-an",
         "-c:v", "libx264",
-        "-crf", "18",
-        "-preset", "fast",
+        "-crf", str(X264_CRF),
+        "-preset", X264_PRESET,
         "-pix_fmt", "yuv420p",
-        "-r", "30", "-vsync", "cfr",
-        output_path,
+        "-r", str(FPS), "-vsync", "cfr",
     ]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd.append(output_path)
 
     print(f"  Processing: {os.path.basename(input_path)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, f"clip {os.path.normpath(input_path)}")
     if result.returncode != 0:
         print(f"  ERROR:\n{result.stderr[-3000:]}")
         raise RuntimeError(f"ffmpeg failed for {input_path}")
@@ -70,44 +116,133 @@ def concatenate_clips(clip_paths, output_path):
         output_path,
     ]
     print(f"  Concatenating → {output_path}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, f"concat {os.path.basename(output_path)}")
     os.remove(list_file)
     if result.returncode != 0:
         print(f"  ERROR:\n{result.stderr[-2000:]}")
         raise RuntimeError("concat failed")
 
 
-def process_set(source_dir, target_w, target_h, output_path):
+def clip_inputs(source_dir):
+    """Return the input paths for CLIP_ORDER, raising if any are missing."""
+    paths = []
+    for key in CLIP_ORDER:
+        gender, num = key.split("_")
+        input_path = os.path.join(source_dir, f"{gender}_{num}.mp4")
+
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Missing: {input_path}")
+        paths.append(input_path)
+    return paths
+
+
+def filtergraph(n_inputs, target_w, target_h):
+    """Build a filter_complex that trims, scales/crops and concats n inputs."""
+    n_frames = int(round(CLIP_DURATION * FPS))
+    chains = []
+    for i in range(n_inputs):
+        chains.append(
+            f"[{i}:v]fps={FPS},trim=end_frame={n_frames},setpts=PTS-STARTPTS,"
+            f"scale={target_w}:{target_h}:force_original_aspect_ratio=increase,"
+            f"crop={target_w}:{target_h},setsar=1,format=yuv420p[v{i}]"
+        )
+    labels = "".join(f"[v{i}]" for i in range(n_inputs))
+    chains.append(f"{labels}concat=n={n_inputs}:v=1:a=0[out]")
+    return ";".join(chains)
+
+
+def render_set(input_paths, target_w, target_h, output_path, threads=None):
+    """Encode all clips into output_path in a single filter_complex pass."""
+    cmd = ["ffmpeg", "-y"]
+    for input_path in input_paths:
+        # Stop demuxing a second past the cut; trim makes the exact cut
+        cmd += ["-t", str(CLIP_DURATION + 1), "-i", input_path]
+    cmd += [
+        "-filter_complex", filtergraph(len(input_paths), target_w, target_h),
+        "-map", "[out]",
+        "-an",
+        "-c:v", "libx264",
+        "-crf", str(X264_CRF),
+        "-preset", X264_PRESET,
+        "-pix_fmt", "yuv420p",
+        "-r", str(FPS), "-vsync", "cfr",
+    ]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd.append(output_path)
+
+    print(f"  Rendering {len(input_paths)} clips in one pass → {output_path}")
+    result = run_ffmpeg(cmd, f"render {os.path.basename(output_path)}")
+    if result.returncode != 0:
+        print(f"  ERROR:\n{result.stderr[-3000:]}")
+        raise RuntimeError(f"ffmpeg failed for {output_path}")
+
+
+def process_set(source_dir, target_w, target_h, output_path, threads=None):
+    """Build one output video; returns the wall-clock seconds it took."""
+    start = time.perf_counter()
     label = "Portrait" if target_h > target_w else "Landscape"
     print(f"\n{'=' * 50}")
     print(f"  Building {label}  →  {output_path}")
     print(f"{'=' * 50}")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_clips = []
-        for key in CLIP_ORDER:
-            gender, num = key.split("_")
-            input_path = os.path.join(source_dir, f"{gender}_{num}.mp4")
-
-            if not os.path.exists(input_path):
-                raise FileNotFoundError(f"Missing: {input_path}")
-
-            clip_out = os.path.join(tmpdir, f"{key}.mp4")
-            build_clip(input_path, clip_out, target_w, target_h)
-            tmp_clips.append(clip_out)
-
-        concatenate_clips(tmp_clips, output_path)
-
-    print(f"  ✓ Done → {output_path}")
+    input_paths = clip_inputs(source_dir)
+    digests = [build_cache.file_digest(p) for p in input_paths]
+    key = output_key(digests, target_w, target_h)
+    if build_cache.output_is_current(output_path, key):
+        print("  Up to date, nothing to rebuild")
+        return time.perf_counter() - start
+
+    with trace_span(output_path, cat="output", engine=ENGINE):
+        if ENGINE == "filtergraph":
+            render_set(input_paths, target_w, target_h, output_path, threads)
+        else:
+            clips = []
+            for input_path, digest in zip(input_paths, digests):
+                clip_out, built = build_cache.build_target(
+                    clip_target(digest, target_w, target_h),
+                    lambda tmp: build_clip(input_path, tmp, target_w, target_h, threads))
+                if not built:
+                    print(f"  Reusing: {os.path.basename(input_path)}")
+                clips.append(clip_out)
+
+            concatenate_clips(clips, output_path)
+    build_cache.record_output(output_path, key)
+
+    elapsed = time.perf_counter() - start
+    print(f"  ✓ Done → {output_path}  ({elapsed:.1f}s)")
+    return elapsed
+
+
+def build_outputs(outputs, parallel=None):
+    """Build every (source_dir, w, h, output) set; returns {output: seconds}.
+
+    In parallel mode (default: PARALLEL_OUTPUTS) each set gets an equal
+    share of the CPU cores.
+    """
+    if parallel is None:
+        parallel = PARALLEL_OUTPUTS
+    if not parallel or len(outputs) < 2:
+        return {out[3]: process_set(*out) for out in outputs}
+
+    threads = max(1, (os.cpu_count() or 1) // len(outputs))
+    with ThreadPoolExecutor(max_workers=len(outputs)) as pool:
+        futures = {out[3]: pool.submit(process_set, *out, threads) for out in outputs}
+        return {path: future.result() for path, future in futures.items()}
 
 
 # ─────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    process_set(LANDSCAPE_DIR, LANDSCAPE_W, LANDSCAPE_H, OUTPUT_CARD)
-    process_set(PORTRAIT_DIR, PORTRAIT_W, PORTRAIT_H, OUTPUT_DETAILS)
+    start = time.perf_counter()
+    timings = build_outputs(OUTPUTS)
+    total = time.perf_counter() - start
 
     print("\n✓ All outputs ready:")
-    print(f"  {OUTPUT_CARD}")
-    print(f"  {OUTPUT_DETAILS}")
+    for path, elapsed in timings.items():
+        print(f"  {path}  ({elapsed:.1f}s)")
+    print(f"  Total wall time: {total:.1f}s")
+
+    if TRACE_PATH:
+        write_trace(TRACE_PATH)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+DemoScope Animated Teleprompter Preview
+=======================================
+Renders an animated App Preview from the same design as the screenshot
+cards: the gradient, headline and subtitle stay put while the phone plays
+the clip and the teleprompter text scrolls through its lines.
+
+Frames are decoded from Portrait/<clip>.mp4 through a rawvideo pipe
+(generate_appstore_assets.iter_frames), composited one at a time and
+written straight into an ffmpeg encoder's stdin. No frames are written to
+disk, and memory use is the same for a 3-second preview as for a
+3-minute one.
+
+Only the screen changes from frame to frame. The backdrop, the phone's
+drop shadow and shell, the shade and the teleprompter fonts are flattened
+or sized once per preview. Each frame is then shaded, lettered and pasted
+into the phone in RGB, with no full-card alpha compositing.
+
+Usage:
+    python3 teleprompter_preview.py [--devices iPhone iPad] [--langs en-US]
+                                    [--clips woman_1 ...] [--seconds 6]
+
+Output:
+    AppStorePreviews/<device>/<lang>/<clip>.mp4  (App Preview size and
+    encoding settings, from combine_preview_videos.py)
+"""
+
+import argparse
+import os
+import time
+
+from PIL import Image, ImageChops
+
+import combine_preview_videos as cpv
+import generate_appstore_assets as gaa
+from ffmpeg_runner import run_ffmpeg, trace_span, write_trace
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+OUTPUT_DIR = os.path.join(gaa.BASE_DIR, "AppStorePreviews")
+SIZES = {name: (cfg["width"], cfg["height"]) for name, cfg in cpv.DEVICES.items()}
+
+PREVIEW_SECONDS = 6  # per preview, capped at what is left of the clip
+START_SECONDS = 0  # where in each clip the preview starts
+SCROLL_HOLD = 0.15  # fraction of the preview held on the first and on the last line
+
+TRACE_PATH = None  # e.g. "teleprompter_trace.json"
+
+
+# ─────────────────────────────────────────────
+# RENDERING
+# ─────────────────────────────────────────────
+
+class CardStage:
+    """The frame-independent parts of an animated card, built once.
+
+    Each frame is within one level of make_card()'s pixels (the shade is a
+    multiply rather than an alpha composite, for one), except that:
+    - the teleprompter text is sized to fit every line, not just the
+      highlighted one, so it can be smaller than on the still;
+    - frames come cover-scaled from ffmpeg (iter_frames), not from
+      scale_to_cover().
+    """
+
+    def __init__(self, cw, ch, clip, lang):
+        clip_idx = gaa.CLIPS.index(clip)
+        c1, c2 = gaa.BG_GRADIENTS[clip]
+        self.clip, self.lang = clip, lang
+        self.phone_w, self.phone_h, self.bezel = gaa.phone_geometry(cw, ch)
+        self.screen_size = (self.phone_w - 2 * self.bezel, self.phone_h - 2 * self.bezel)
+        shell = gaa.build_phone_shell(self.phone_w, self.phone_h, c1)
+
+        background = gaa.gradient_bg(cw, ch, c1, c2, mode="RGBA")
+        canvas, content_bottom = gaa.card_backdrop(background, cw, ch, lang, clip_idx)
+        self.phone_pos = ((cw - shell.width) // 2, content_bottom)
+
+        # The phone's outline never changes, so the shadow and shell are
+        # flattened onto the backdrop once; frames only fill in the screen
+        shadow_off, shadow_blur = gaa.shadow_params(cw)
+        shadow = gaa.make_shadow(shell, blur=shadow_blur, opacity=50)
+        canvas = gaa.composite_with_shadow(canvas, shell, self.phone_pos, offset=shadow_off,
+                                           blur=shadow_blur, shadow=shadow)
+        self.backdrop = canvas.convert("RGB")
+
+        # Shading with black at alpha a is a multiply by (255 - a) / 255
+        white = Image.new("RGBA", self.screen_size, (255, 255, 255, 255))
+        self.shade = gaa.add_teleprompter_shade(white).convert("RGB")
+
+        self.lines = gaa.PROMPTER_TEXT[clip][lang]
+        # Sized for every line, so the text doesn't jump as the highlight moves
+        self.font_sizes = gaa.teleprompter_font_sizes(lang, self.lines, *self.screen_size,
+                                                      active=None)
+
+    def render(self, frame, position):
+        """Composite one card (RGB) for a screen-sized RGB *frame*."""
+        screen = ImageChops.multiply(frame, self.shade)
+        gaa.draw_teleprompter_text(screen, self.lang, self.clip, position, self.font_sizes)
+        canvas = self.backdrop.copy()
+        gaa.place_screen(canvas, screen, self.phone_w, self.phone_h, self.bezel,
+                         origin=self.phone_pos)
+        return canvas
+
+
+def scroll_position(t, n_lines):
+    """Teleprompter line position at fraction *t* of the preview.
+
+    Holds on the first and last lines and scrolls at a constant speed between.
+    """
+    t = (t - SCROLL_HOLD) / (1 - 2 * SCROLL_HOLD)
+    return min(max(t, 0.0), 1.0) * (n_lines - 1)
+
+
+def encoder_command(cw, ch, output_path):
+    """ffmpeg command encoding RGB frames from stdin to an App Preview."""
+    return [
+        "ffmpeg", "-y",
+        # Composited frames, piped in
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{cw}x{ch}", "-framerate", str(cpv.FPS),
+        "-i", "pipe:0",
+        # Generate silent audio (anullsrc) — Apple requires an audio track
+        "-f", "lavfi", "-i",
+        f"anullsrc=channel_layout=stereo:sample_rate={cpv.AUDIO_SAMPLE_RATE}",
+        *cpv.video_codec_args(),
+        # RGB in, so convert with the matrix the output is tagged with
+        "-vf", "scale=out_color_matrix=bt709:out_range=tv,setsar=1:1,format=yuv420p",
+        *cpv.audio_codec_args(),
+        "-shortest",
+        "-map", "0:v:0",
+        "-map", "1:a:0",
+        "-movflags", "+faststart",
+        output_path,
+    ]
+
+
+def render_preview(device, lang, clip, seconds=PREVIEW_SECONDS, start=START_SECONDS):
+    """Render one animated preview; returns its path."""
+    cw, ch = SIZES[device]
+    video_path = os.path.join(gaa.PORTRAIT_DIR, f"{clip}.mp4")
+    duration = cpv.get_duration(video_path)
+    if duration is not None:
+        seconds = min(seconds, duration - start)
+    if seconds <= 0:
+        raise ValueError(f"{video_path} is shorter than the {start}s start offset")
+    n_frames = max(1, round(seconds * cpv.FPS))
+
+    out_path = os.path.join(OUTPUT_DIR, device, lang, f"{clip}.mp4")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path[:-len(".mp4")] + ".partial.mp4"
+
+    stage = CardStage(cw, ch, clip, lang)
+    stats = {"frames": 0, "render": 0.0}
+
+    def feed(stdin):
+        frames = gaa.iter_frames(video_path, stage.screen_size, cpv.FPS, start, seconds)
+        for i, frame in enumerate(frames):
+            t0 = time.perf_counter()
+            position = scroll_position(i / max(n_frames - 1, 1), len(stage.lines))
+            data = stage.render(frame, position).tobytes()
+            stats["render"] += time.perf_counter() - t0
+            stats["frames"] += 1
+            stdin.write(data)
+
+    label = f"{device}/{lang}/{clip}"
+    try:
+        result = run_ffmpeg(encoder_command(cw, ch, tmp_path), label, feed=feed)
+        if result.returncode != 0 or not stats["frames"]:
+            print(f"  ERROR:\n{result.stderr[-3000:]}")
+            raise RuntimeError(f"ffmpeg failed for {label}")
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    ms = stats["render"] * 1000 / stats["frames"]
+    print(f"  OK  {label}: {stats['frames']} frames, {ms:.1f} ms/frame compositing")
+    return out_path
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render animated teleprompter App Previews")
+    parser.add_argument("--devices", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--langs", nargs="+", default=["en-US"], choices=gaa.LANGUAGES)
+    parser.add_argument("--clips", nargs="+", default=gaa.CLIPS, choices=gaa.CLIPS)
+    parser.add_argument("--seconds", type=float, default=PREVIEW_SECONDS,
+                        help="length of each preview (default: %(default)s)")
+    parser.add_argument("--start", type=float, default=START_SECONDS,
+                        help="offset into each clip in seconds (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.seconds <= 0:
+        parser.error("--seconds must be positive")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    print("DemoScope Animated Teleprompter Preview")
+    print("=" * 50)
+    gaa.detect_fonts()
+
+    for clip in args.clips:
+        path = os.path.join(gaa.PORTRAIT_DIR, f"{clip}.mp4")
+        if not os.path.exists(path):
+            print(f"  SKIP: {path} not found")
+            continue
+        for device in args.devices:
+            for lang in args.langs:
+                with trace_span(f"{device}/{lang}/{clip}", cat="preview"):
+                    render_preview(device, lang, clip, args.seconds, args.start)
+
+    if TRACE_PATH:
+        write_trace(TRACE_PATH)
+    print(f"\nDone! Previews in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()